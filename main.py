@@ -1,4 +1,7 @@
+import uvicorn
 from src.main import app
 
 if __name__ == "__main__":
-  uvicorn.run('src.main:app', host='0.0.0.0', port=8000, reload=True)
\ No newline at end of file
+  # uvloop event loop; media frames are already compressed, so per-message deflate only costs CPU
+  uvicorn.run('src.main:app', host='0.0.0.0', port=8000, reload=True,
+              loop="uvloop", ws="websockets", ws_max_size=16 * 1024 * 1024, ws_per_message_deflate=False)
@@ -2,6 +2,7 @@ import os
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from dotenv import load_dotenv
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -16,10 +17,36 @@ DATABASE_URL = os.getenv("DATABASE_URL",f"postgresql://{os.getenv('DB_USERNAME',
 
 DATABASE_URL = f"postgresql+psycopg://{os.getenv('DB_USERNAME', 'user')}:{os.getenv('DB_PASSWORD', 'password')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'intraviewer_db')}"
 
-engine = create_engine(DATABASE_URL)
+# Larger compiled-statement cache so the per-session hot-path statements are never evicted
+QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+
+# Each pool can open pool_size + max_overflow connections per worker process; keep the sum of both engines
+# times the number of workers under Postgres max_connections (100 by default, as in docker-compose).
+# The async engine carries the websocket sessions; the sync one only serves the light CRUD routes.
+POOL_OPTIONS = dict(
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    pool_pre_ping=True,
+    query_cache_size=QUERY_CACHE_SIZE,
+)
+ASYNC_POOL_OPTIONS = dict(
+    POOL_OPTIONS,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "30")),
+)
+SYNC_POOL_OPTIONS = dict(
+    POOL_OPTIONS,
+    pool_size=int(os.getenv("DB_SYNC_POOL_SIZE", "5")),
+    max_overflow=int(os.getenv("DB_SYNC_MAX_OVERFLOW", "5")),
+)
+
+engine = create_engine(DATABASE_URL, **SYNC_POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# psycopg 3 has a native asyncio driver, so the same URL backs the async engine
+async_engine = create_async_engine(DATABASE_URL, **ASYNC_POOL_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -27,6 +54,29 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# create_all() skips tables that already exist, so columns/indexes added to existing models are applied here.
+# Every statement is idempotent and runs on each startup, after create_all().
+SCHEMA_UPGRADES = (
+    "ALTER TABLE live_chunks_input ADD COLUMN IF NOT EXISTS video_uri VARCHAR",
+    "CREATE INDEX IF NOT EXISTS ix_live_chunks_video ON live_chunks_input (session_id, id) "
+    "WHERE video_chunk IS NOT NULL OR video_uri IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS ix_questions_session_id ON questions (session_id)",
+    "CREATE INDEX IF NOT EXISTS ix_transcripts_session_id ON transcripts (session_id)",
+    "CREATE INDEX IF NOT EXISTS ix_emotion_analysis_session_id ON emotion_analysis (session_id)",
+    "CREATE INDEX IF NOT EXISTS ix_qna_results_session_id ON qna_results (session_id)",
+    "CREATE INDEX IF NOT EXISTS ix_emotion_results_session_id ON emotion_results (session_id)",
+)
+
+def apply_schema_upgrades():
+    """Bring an existing database up to the current models (no-op on a fresh one)."""
+    with engine.begin() as connection:
+        for statement in SCHEMA_UPGRADES:
+            connection.execute(text(statement))
+
 def test_database_connection():
     """Test if database connection is working"""
     try:
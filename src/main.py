@@ -1,15 +1,25 @@
 from fastapi import FastAPI
-from src.db.database import get_db, test_database_connection, engine, Base
+from src.db.database import get_db, test_database_connection, apply_schema_upgrades, engine, Base
 from fastapi.middleware.cors import CORSMiddleware
 from src.routers import auth, users, questions, userinput, sessions,tips
 from src.models import models # Ensure all models are loaded for create_all
 import os
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 from fastapi import FastAPI, WebSocket, UploadFile, File
 
 # Load environment variables
 load_dotenv()
 
+# INFO by default so per-message DEBUG logs on the websocket hot path stay off in production.
+# The event loop only enqueues records; a listener thread does the stream I/O.
+# QueueHandler.prepare() still formats each record (message, exc_info) on the calling thread, i.e. the loop.
+_log_queue = queue.SimpleQueue()
+log_listener = QueueListener(_log_queue, logging.StreamHandler(), respect_handler_level=True)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), handlers=[QueueHandler(_log_queue)])
+
 app = FastAPI(title="Intraviewer Backend", version="1.0.0")
 
 app.add_middleware(
@@ -37,11 +47,20 @@ app.add_middleware(
 #     }
 ## use this only when you are testing
 
+@app.on_event("startup")
+async def start_log_listener():
+    log_listener.start()
+
+@app.on_event("shutdown")
+async def stop_log_listener():
+    log_listener.stop() # flushes whatever is still queued
+
 @app.on_event("startup")
 
 async def create_db_tables():
     """Create database tables on startup"""
     Base.metadata.create_all(bind=engine)
+    apply_schema_upgrades() # columns/indexes create_all cannot add to existing tables
     test_database_connection()
     print("☑️ Database connected and tables created (if not exist).")
 
@@ -1,5 +1,5 @@
-from sqlalchemy import Boolean, Column, Enum, ForeignKey, Integer, String, LargeBinary, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Enum, ForeignKey, Index, Integer, String, LargeBinary, Text
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql.expression import text
 from sqlalchemy.sql.sqltypes import TIMESTAMP,Time
 from src.db.database import Base
@@ -40,7 +40,7 @@ class Questions(Base):
 
     id = Column(Integer, primary_key=True, unique=True, nullable=False,index = True)
     question_text = Column(String, unique=False, nullable = False)
-    session_id = Column(Integer, ForeignKey("session.id", ondelete="CASCADE"), nullable=False) # ADDED THIS
+    session_id = Column(Integer, ForeignKey("session.id", ondelete="CASCADE"), nullable=False, index=True) # ADDED THIS
     difficulty_level = Column(Enum(DifficultyLevel), unique=False, nullable = True)
     order = Column(Integer)
     created_at = Column(TIMESTAMP(timezone = "True"),server_default = text("NOW()"),nullable = False)
@@ -67,7 +67,7 @@ class Cv(Base):
     __tablename__ = "cv_uploads"
     id = Column(Integer, primary_key=True, unique=True, nullable=False,index = True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    CV_data:bytes = Column(LargeBinary, unique=False, nullable = False) # storing cv as bytes
+    CV_data:bytes = deferred(Column(LargeBinary, unique=False, nullable = False)) # storing cv as bytes (deferred, analysis only needs cv_text)
     cv_text = Column(String, unique=False, nullable = False) # extracted text from the cv for further processing
     uploaded_at = Column(TIMESTAMP(timezone = "True"),server_default = text("NOW()"),nullable = False)
 
@@ -80,10 +80,17 @@ class TextPrompts(Base):
 
 class LiveChunksInput(Base):
     __tablename__ = "live_chunks_input"
+    __table_args__ = (
+        # video rows of a session in arrival order, without touching the audio blobs
+        Index("ix_live_chunks_video", "session_id", "id",
+              postgresql_where=text("video_chunk IS NOT NULL OR video_uri IS NOT NULL")),
+    )
     id = Column(Integer, primary_key=True, unique=True, nullable=False, index=True)
     session_id = Column(Integer, ForeignKey("session.id", ondelete="CASCADE"), nullable=False)
-    audio_chunk = Column(LargeBinary, nullable=True)  # ✅ Changed from String to LargeBinary
-    video_chunk = Column(LargeBinary, nullable=True)  # ✅ Changed from String to LargeBinary
+    # blobs are deferred: only loaded when accessed or requested with undefer()
+    audio_chunk = deferred(Column(LargeBinary, nullable=True))  # ✅ Changed from String to LargeBinary
+    video_chunk = deferred(Column(LargeBinary, nullable=True))  # ✅ Changed from String to LargeBinary
+    video_uri = Column(String, nullable=True)  # key in the media store (MEDIA_ROOT); new frames are no longer stored inline
     created_at = Column(TIMESTAMP(timezone="True"), server_default=text("NOW()"), nullable=False)
     
     session = relationship("InterviewSession", back_populates="live_chunks")
@@ -91,7 +98,7 @@ class LiveChunksInput(Base):
 class Transcript(Base): # now here our whisper sent user_response and ai_response to backend will be stored
     __tablename__ = "transcripts"
     id = Column(Integer, primary_key=True, unique=True, nullable=False,index = True)
-    session_id = Column(Integer, ForeignKey("session.id", ondelete="CASCADE"), nullable=False) #multiple transcripts can belong to one session
+    session_id = Column(Integer, ForeignKey("session.id", ondelete="CASCADE"), nullable=False, index=True) #multiple transcripts can belong to one session
     is_ai_response = Column(Boolean, unique=False, nullable = False,default=False) # to identify if the transcript is from ai or user
     ai_response = Column(String, unique=False, nullable = True)
     user_response = Column(String, unique=False, nullable = True)
@@ -103,7 +110,7 @@ class Transcript(Base): # now here our whisper sent user_response and ai_respons
 class EmotionAnalysis(Base):    
     __tablename__ = "emotion_analysis"
     id = Column(Integer, primary_key=True, unique=True, nullable=False,index = True)
-    session_id = Column(Integer, ForeignKey("session.id", ondelete="CASCADE"), nullable=False)
+    session_id = Column(Integer, ForeignKey("session.id", ondelete="CASCADE"), nullable=False, index=True)
     emotion_label = Column(String, unique=False, nullable = False)
     emotion_score = Column(String, unique=False, nullable = False)
     created_at = Column(TIMESTAMP(timezone = "True"),server_default = text("NOW()"),nullable = False)
@@ -112,7 +119,7 @@ class EmotionAnalysis(Base):
 class Qna_result(Base): # this stores each question answer pair result from ai for each question in the session so 1 to many relationship with session and question
     __tablename__ = "qna_results"
     id = Column(Integer, primary_key=True, unique=True, nullable=False,index = True)
-    session_id = Column(Integer, ForeignKey("session.id", ondelete="CASCADE"), nullable=False)
+    session_id = Column(Integer, ForeignKey("session.id", ondelete="CASCADE"), nullable=False, index=True)
     question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"),nullable=False)
     score = Column(Integer, unique=False, nullable = False)
     feedback = Column(Text, unique=False, nullable = True)
@@ -123,7 +130,7 @@ class Qna_result(Base): # this stores each question answer pair result from ai f
 class Emotion_result(Base): # it stores whole session single emotion analysis result like overall perception, recommendation and confidence level
     __tablename__ = "emotion_results"
     id = Column(Integer, primary_key=True, unique=True, nullable=False,index = True)
-    session_id = Column(Integer, ForeignKey("session.id", ondelete="CASCADE"), nullable=False)
+    session_id = Column(Integer, ForeignKey("session.id", ondelete="CASCADE"), nullable=False, index=True)
     perception = Column(String, unique=False, nullable = False)
     recommendation = Column(Text, unique=False, nullable = False)
     confidence = Column(String, unique=False, nullable = False)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, status, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from src.db.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.db.database import get_async_db
 from src.core.security import auth_scheme , get_current_user
 from src.services.sessions import SessionService
 from fastapi import WebSocket
@@ -13,7 +13,7 @@ router = APIRouter(tags=["Sessions"], prefix="/sessions")
 async def start_session(
     request: SessionCreateRequest,
     token: HTTPAuthorizationCredentials = Depends(auth_scheme), # Extract token from Authorization header
-    db: Session = Depends(get_db), # Get database session
+    db: AsyncSession = Depends(get_async_db), # Get database session
 ):
     return await SessionService.create_session(
         token=token,
@@ -26,7 +26,7 @@ async def start_session(
 async def end_session(
     session_id: int,
     token: HTTPAuthorizationCredentials = Depends(auth_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     return await SessionService.complete_session(
         token=token,
@@ -35,14 +35,14 @@ async def end_session(
     )
 
 @router.websocket("/ws/sessions/{session_id}")
-async def session_websocket_endpoint(websocket: WebSocket, session_id: int,db: Session = Depends(get_db)):
-    return await SessionService.handle_session_websocket(websocket=websocket, session_id=session_id, db=db)
+async def session_websocket_endpoint(websocket: WebSocket, session_id: int):
+    return await SessionService.handle_session_websocket(websocket=websocket, session_id=session_id)
 
 @router.get("/questions/{session_id}", status_code=status.HTTP_200_OK)
 async def get_session_questions(
     session_id: int,
     token: HTTPAuthorizationCredentials = Depends(auth_scheme), # Extract token from Authorization header
-    db: Session = Depends(get_db), # Get database session
+    db: AsyncSession = Depends(get_async_db), # Get database session
 ):
     return await SessionService.fetch_session_questions( # fetch question function to be made soon
         token=token,
@@ -53,7 +53,7 @@ async def get_session_questions(
 @router.get("/{session_id}/analyze")
 async def get_session_analysis(
     session_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: HTTPAuthorizationCredentials = Depends(auth_scheme)
 ):
     return await SessionService.analyse_session(
@@ -65,7 +65,7 @@ async def get_session_analysis(
 @router.get("/{session_id}/analyss/result")
 async def get_analysis_result(
     session_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: HTTPAuthorizationCredentials = Depends(auth_scheme)
 ):
     return await SessionService.fetch_session_analysis(
@@ -77,7 +77,7 @@ async def get_analysis_result(
 @router.get("/{session_id}/transcript")
 async def get_session_transcript(
     session_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: HTTPAuthorizationCredentials = Depends(auth_scheme)
 ):
     return await SessionService.fetch_session_transcript(
@@ -90,7 +90,7 @@ async def get_session_transcript(
 async def terminate_session(
     session_id: int,
     token: HTTPAuthorizationCredentials = Depends(auth_scheme), # Extract token from Authorization header
-    db: Session = Depends(get_db), # Get database session
+    db: AsyncSession = Depends(get_async_db), # Get database session
 ):
     return await SessionService.terminate_session(
         token=token,
@@ -101,7 +101,7 @@ async def terminate_session(
 async def delete_session(
     session_id: int,
     token: HTTPAuthorizationCredentials = Depends(auth_scheme), 
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_async_db), 
 ):
     return await SessionService.delete_session(
         token=token,
@@ -9,4 +9,4 @@ router = APIRouter(tags=["Tips"], prefix="/tips")
 async def get_random_tip(
     token: HTTPAuthorizationCredentials = Depends(auth_scheme)
 ):
-    return TipsForInterviewService.get_random_tips(token)
+    return await TipsForInterviewService.get_random_tips(token)
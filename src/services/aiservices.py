@@ -1,22 +1,128 @@
 import io
+import os
+
+# Split the cores between concurrent Whisper runs instead of letting each one spawn a full OpenMP team.
+# Has to be set before ctranslate2/faster_whisper (and torch) are imported.
+WHISPER_CONCURRENCY = int(os.getenv("WHISPER_CONCURRENCY", "1"))
+WHISPER_CPU_THREADS = max(1, (os.cpu_count() or 4) // WHISPER_CONCURRENCY)
+os.environ.setdefault("OMP_NUM_THREADS", str(WHISPER_CPU_THREADS))
+
 import asyncio
 import json
 import re
 import gc
+from collections import deque
+import logging
+import functools
+import threading
 from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
-from faster_whisper import WhisperModel
+import ctranslate2
+from faster_whisper import WhisperModel, decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps
 import torch
 from transformers import pipeline
 import tensorflow as tf
 import numpy as np
 import cv2
+from src.utils.frames import preprocess_frame, get_face_cascade
+
+logger = logging.getLogger(__name__)
 
 # --- MEMORY MANAGEMENT ---
 whisper_model = None
 llm_model = None
 emotion_resources = None
 
+# Every AudioProcessor has its own executor, so this caps concurrent Whisper runs across all sessions
+_whisper_slots = asyncio.Semaphore(WHISPER_CONCURRENCY)
+
+# Utterance buffering: audio is decoded to 16 kHz PCM and only sent to Whisper once Silero VAD sees the speaker stop
+SAMPLE_RATE = 16000
+# A pause this long ends the utterance; interview answers have short thinking pauses, so keep it generous
+UTTERANCE_END_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "1000"))
+MAX_UTTERANCE_S = 30
+UTTERANCE_VAD = VadOptions(
+    min_silence_duration_ms=UTTERANCE_END_SILENCE_MS,
+    threshold=float(os.getenv("VAD_THRESHOLD", "0.35")),
+    speech_pad_ms=int(os.getenv("VAD_SPEECH_PAD_MS", "200")),
+    min_speech_duration_ms=int(os.getenv("VAD_MIN_SPEECH_MS", "250")),
+)
+# VAD only re-reads this much audio before each new chunk: enough to see a full end-of-utterance pause plus padding
+VAD_TAIL_SAMPLES = SAMPLE_RATE * (UTTERANCE_END_SILENCE_MS + 2 * UTTERANCE_VAD.speech_pad_ms + 500) // 1000
+# Cheap pre-filters so empty or silent chunks never reach the decoder/VAD
+MIN_AUDIO_BYTES = 256
+SILENCE_RMS = 0.005 # float PCM in [-1, 1], roughly -46 dBFS
+# Previous utterances carried into the next decode as initial_prompt (Whisper keeps ~224 prompt tokens)
+PROMPT_CONTEXT_UTTERANCES = 4
+PROMPT_CONTEXT_CHARS = 800
+# While the speaker is still talking, the utterance so far is re-decoded for a hypothesis after this much new audio (0 disables)
+HYPOTHESIS_INTERVAL_S = float(os.getenv("HYPOTHESIS_INTERVAL_S", "2"))
+
+# Whisper runs on CTranslate2: int8 weights with fp16 compute on a CUDA GPU, plain int8 on CPU.
+# WHISPER_DEVICE / WHISPER_COMPUTE_TYPE override the detection (e.g. compute type "auto" lets CTranslate2 choose).
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto")
+if WHISPER_DEVICE == "auto":
+    WHISPER_DEVICE = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE") or ("int8_float16" if WHISPER_DEVICE == "cuda" else "int8")
+# Any faster-whisper size or CT2 model path; "distil-large-v3" (int8) is a faster-than-real-time option on CPU
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+# Distil-Whisper is trained without conditioning on the previous window's text
+WHISPER_CONDITION_ON_PREVIOUS = "distil" not in WHISPER_MODEL
+# Passing the language skips Whisper's detection pass; "auto" detects once per session and reuses the result
+WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "en")
+# Greedy decoding for live answers; WHISPER_BEAM_SIZE=5 brings beam search back for offline re-transcription
+WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "1"))
+# Model files are kept here so restarts do not re-download them
+WHISPER_DOWNLOAD_ROOT = os.getenv("WHISPER_DOWNLOAD_ROOT", "./models")
+
+# LLM output parsing: numbered question lines, and label prefixes the model sometimes puts before an answer
+_NUMBERED_LINE = re.compile(r'^\d+\.\s*(.*)')
+_ANSWER_LABEL = re.compile(r'^(Answer:|Recommended Answer:|Ideal Answer:|Response:)\s*', re.IGNORECASE)
+
+# JPEG decode + face crop: cv2.imdecode / detectMultiScale / resize release the GIL, so a few threads use
+# several cores without spawning processes (which would re-import the app) or pickling frames.
+FRAME_WORKERS = int(os.getenv("FRAME_WORKERS", str(min(4, os.cpu_count() or 1))))
+FRAME_POOL = ThreadPoolExecutor(max_workers=FRAME_WORKERS, thread_name_prefix="frames")
+
+# Emotion model runs as an int8 (dynamic-range quantized) TFLite model on CPU; EMOTION_INT8=0 keeps the FP32 Keras model
+EMOTION_MODEL_PATH = 'best_model.h5'
+EMOTION_INT8 = os.getenv("EMOTION_INT8", "1") == "1"
+# Generated on first load; kept under the (git-ignored) models/ directory with the downloaded Whisper weights
+EMOTION_INT8_PATH = os.getenv("EMOTION_INT8_PATH", os.path.join("models", "best_model.int8.tflite"))
+
+class QuantizedEmotionModel:
+    """int8 TFLite interpreter with the Keras predict() call shape used by EmotionDetector."""
+    def __init__(self, tflite_model: bytes):
+        self.interpreter = tf.lite.Interpreter(model_content=tflite_model, num_threads=os.cpu_count())
+        self.input_index = self.interpreter.get_input_details()[0]["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self.batch_size = None
+        self.lock = threading.Lock() # an interpreter must not be invoked from two threads at once
+
+    def predict(self, batch: np.ndarray, verbose=0) -> np.ndarray:
+        with self.lock:
+            if batch.shape[0] != self.batch_size:
+                self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+                self.interpreter.allocate_tensors()
+                self.batch_size = batch.shape[0]
+            self.interpreter.set_tensor(self.input_index, batch.astype(np.float32, copy=False))
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index).copy()
+
+def _quantize_emotion_model(model) -> QuantizedEmotionModel:
+    """Convert the Keras model once and cache the .tflite (rebuilt when best_model.h5 is newer)."""
+    if os.path.exists(EMOTION_INT8_PATH) and os.path.getmtime(EMOTION_INT8_PATH) >= os.path.getmtime(EMOTION_MODEL_PATH):
+        with open(EMOTION_INT8_PATH, "rb") as f:
+            return QuantizedEmotionModel(f.read())
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT] # int8 weights, int8 kernels where supported
+    tflite_model = converter.convert()
+    os.makedirs(os.path.dirname(EMOTION_INT8_PATH) or ".", exist_ok=True)
+    with open(EMOTION_INT8_PATH, "wb") as f:
+        f.write(tflite_model)
+    return QuantizedEmotionModel(tflite_model)
+
 def unload_llm():
     global llm_model
     if llm_model is not None:
@@ -55,14 +161,35 @@ def unload_whisper():
         gc.collect()
         print("✅ Whisper Unloaded.")
 
+# Transcriptions call load_whisper() from several executor threads; only one of them may build the model
+_whisper_load_lock = threading.Lock()
+
 def load_whisper():
     global whisper_model
-    if whisper_model is None:
+    if whisper_model is not None:
+        return whisper_model
+    with _whisper_load_lock:
+        if whisper_model is not None:
+            return whisper_model # another thread finished loading while we waited
         unload_llm()
 
 
-        print("🎤 Loading Whisper Model...")
-        whisper_model = WhisperModel("base", device="cpu", compute_type="int8")
+        print(f"🎤 Loading Whisper Model {WHISPER_MODEL} ({WHISPER_DEVICE}, {WHISPER_COMPUTE_TYPE})...")
+        model = WhisperModel(
+            WHISPER_MODEL,
+            device=WHISPER_DEVICE,
+            compute_type=WHISPER_COMPUTE_TYPE,
+            download_root=WHISPER_DOWNLOAD_ROOT,
+            cpu_threads=WHISPER_CPU_THREADS,
+            num_workers=WHISPER_CONCURRENCY, # one CT2 worker per allowed concurrent run
+        )
+        try:
+            # One throwaway decode pays the kernel/allocator warmup here rather than on the first answer
+            segments, _ = model.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), language="en", beam_size=1, vad_filter=False)
+            list(segments)
+        except Exception as e:
+            print(f"⚠️ Whisper warmup failed: {e}")
+        whisper_model = model # published only once it is ready
         print("✅ Whisper Loaded.")
     return whisper_model
 
@@ -84,7 +211,13 @@ def load_emotion():
             print("⏳ Loading RAF-DB Emotion Model (best_model.h5)...")
             
             # Load Keras Model
-            model = tf.keras.models.load_model('best_model.h5')
+            model = tf.keras.models.load_model(EMOTION_MODEL_PATH)
+            if EMOTION_INT8:
+                try:
+                    model = _quantize_emotion_model(model)
+                    print("✅ Emotion Model quantized to int8 (TFLite)")
+                except Exception as e:
+                    print(f"⚠️ int8 quantization failed, using FP32 model: {e}")
             
             emotion_resources = model
             print("✅ RAF-DB Emotion Model Loaded!")
@@ -96,38 +229,156 @@ def load_emotion():
 
 class AudioProcessor:
     def __init__(self):
-        self.buffer = []
+        # Preallocated PCM buffer for the utterance in progress: chunks are copied in place instead of re-concatenated
+        self.buffer = np.empty(SAMPLE_RATE * MAX_UTTERANCE_S, dtype=np.float32)
+        self.buffered = 0 # samples currently held
+        self.hypothesis_at = 0 # buffered samples when the last hypothesis was decoded
+        self.speech_end = None # buffer offset where VAD last saw speech end, None until the utterance has speech
         self.executor = ThreadPoolExecutor(max_workers=1)
-
-    async def process_audio(self, audio_chunk: bytes) -> str:
-        self.buffer.append(audio_chunk)
-        if len(self.buffer) >= 1:
-            full_audio = b''.join(self.buffer)
-            self.buffer = []
-            loop = asyncio.get_running_loop()
-            text = await loop.run_in_executor(self.executor, self._transcribe_sync, full_audio)
-            return text
-        return ""
+        # Last few final transcripts, fed back as Whisper's prompt so each utterance is decoded in context
+        self.context = deque(maxlen=PROMPT_CONTEXT_UTTERANCES)
+        self.language = None if WHISPER_LANGUAGE == "auto" else WHISPER_LANGUAGE
+
+    async def process_audio(self, audio_chunk: bytes | memoryview) -> str:
+        """Buffer a chunk; returns the transcript once the utterance has ended, otherwise ""."""
+        text = ""
+        async for is_final, partial in self.stream(audio_chunk):
+            if is_final:
+                text = partial
+        return text
 
     async def flush(self) -> str:
         """Process any remaining audio in the buffer."""
-        if not self.buffer:
-            return ""
-        print(f"🧹 Flushing {len(self.buffer)} remaining chunks...")
-        full_audio = b''.join(self.buffer)
-        self.buffer = []
-        loop = asyncio.get_running_loop()
-        text = await loop.run_in_executor(self.executor, self._transcribe_sync, full_audio)
+        text = ""
+        async for is_final, partial in self.stream(None):
+            if is_final:
+                text = partial
         return text
 
-    def _transcribe_sync(self, audio_bytes: bytes) -> str:
+    async def stream(self, audio_chunk: bytes | memoryview | None):
+        """
+        Async generator of (is_final, text). While the speaker is talking, yields a hypothesis for
+        the utterance so far every HYPOTHESIS_INTERVAL_S of audio. Once it ends, yields the running
+        text as each Whisper segment but the last is decoded, then (True, full transcript).
+        A None chunk flushes whatever is buffered.
+        """
+        loop = asyncio.get_running_loop()
+        if audio_chunk is None:
+            if not self.buffered:
+                return
+            logger.debug("🧹 Flushing %d remaining samples...", self.buffered)
+            utterance = self._take_utterance()
+        else:
+            if len(audio_chunk) < MIN_AUDIO_BYTES:
+                return
+            utterance = await loop.run_in_executor(self.executor, self._buffer_utterance_sync, audio_chunk)
+            if utterance is None:
+                return
+            if isinstance(utterance, tuple):
+                # Still talking: preview decode, skipped rather than queued behind other sessions' final decodes
+                if _whisper_slots.locked():
+                    return
+                async with _whisper_slots:
+                    text = await loop.run_in_executor(self.executor, self._transcribe_sync, utterance[0], None, False)
+                if text.strip():
+                    yield False, text
+                return
+
+        # The worker thread hands each partial back to the loop; None marks the end of decoding
+        partials = asyncio.Queue()
+        emit = functools.partial(loop.call_soon_threadsafe, partials.put_nowait)
+        async with _whisper_slots:
+            job = loop.run_in_executor(self.executor, self._transcribe_streaming_sync, utterance, emit)
+            while (partial := await partials.get()) is not None:
+                yield False, partial
+            text = await job
+        yield True, text
+
+    def _buffer_utterance_sync(self, audio_bytes: bytes):
+        """
+        Decode a chunk into the buffer and return the whole utterance once VAD reports trailing silence.
+        Returns a 1-tuple (utterance so far,) when it is time for a hypothesis, otherwise None.
+        """
         try:
-            model = load_whisper()
-            audio_file = io.BytesIO(audio_bytes)
-            segments, _ = model.transcribe(audio_file, beam_size=5)
-            return "".join([segment.text for segment in segments])
+            pcm = decode_audio(io.BytesIO(audio_bytes), sampling_rate=SAMPLE_RATE)
         except Exception as e:
-            print(f"Local Transcription Error: {e}")
+            logger.warning("Audio Decode Error: %s", e)
+            return None
+
+        if not self.buffered and (pcm.size == 0 or np.sqrt(np.mean(np.square(pcm))) < SILENCE_RMS):
+            # Silence with no utterance in progress; once one is, silent chunks are kept to detect its end
+            return None
+
+        start = self.buffered
+        end = start + pcm.size
+        if end > self.buffer.size:
+            # A chunk can overshoot MAX_UTTERANCE_S; grow once rather than drop audio
+            self.buffer = np.resize(self.buffer, max(end, self.buffer.size * 2))
+        self.buffer[start:end] = pcm
+        self.buffered = end
+        audio = self.buffer[:end] # view, no copy
+
+        # VAD over the new chunk plus a short tail only, so the cost per chunk does not grow with the utterance
+        window_start = max(0, min(start, end - VAD_TAIL_SAMPLES))
+        speech = get_speech_timestamps(audio[window_start:], vad_options=UTTERANCE_VAD, sampling_rate=SAMPLE_RATE)
+        if speech:
+            self.speech_end = window_start + speech[-1]["end"]
+        elif self.speech_end is None:
+            # Only silence so far, nothing worth keeping
+            self.buffered = self.hypothesis_at = 0
+            return None
+
+        trailing_silence = end - self.speech_end
+        if trailing_silence >= SAMPLE_RATE * UTTERANCE_END_SILENCE_MS // 1000 or end >= SAMPLE_RATE * MAX_UTTERANCE_S:
+            return self._take_utterance()
+        if HYPOTHESIS_INTERVAL_S and end - self.hypothesis_at >= SAMPLE_RATE * HYPOTHESIS_INTERVAL_S:
+            self.hypothesis_at = end
+            return (audio.copy(),)
+        return None
+
+    def _take_utterance(self) -> np.ndarray:
+        """Copy the buffered utterance out (the buffer is reused for the next one) and reset it."""
+        utterance = self.buffer[:self.buffered].copy()
+        self.buffered = self.hypothesis_at = 0
+        self.speech_end = None
+        return utterance
+
+    def _transcribe_streaming_sync(self, audio: np.ndarray, emit) -> str:
+        try:
+            return self._transcribe_sync(audio, on_segment=emit)
+        finally:
+            emit(None)
+
+    def _transcribe_sync(self, audio: np.ndarray, on_segment=None, final: bool = True) -> str:
+        """Decode audio; on_segment(text so far) fires before each segment after the first. Only final text joins the context."""
+        try:
+            model = load_whisper()
+            prompt = " ".join(self.context)[-PROMPT_CONTEXT_CHARS:] or None
+            if self.language is None:
+                logger.info("Whisper language auto-detect requested; detecting on this utterance")
+            segments, info = model.transcribe(
+                audio,
+                language=self.language,
+                beam_size=WHISPER_BEAM_SIZE,
+                best_of=1,
+                temperature=0.0,
+                initial_prompt=prompt,
+                condition_on_previous_text=WHISPER_CONDITION_ON_PREVIOUS,
+            )
+            # Later utterances of the session reuse the detected language
+            self.language = info.language
+            # segments is lazy: each one is decoded as the loop reaches it
+            text = ""
+            for segment in segments:
+                # A new segment means the previous text was not the last, so it is still only a hypothesis
+                if text and on_segment is not None:
+                    on_segment(text)
+                text += segment.text
+            if final and text.strip():
+                self.context.append(text.strip())
+            return text
+        except Exception:
+            logger.exception("Local Transcription Error")
             return ""
 
 class LLMService:
@@ -175,11 +426,9 @@ JOB CONTEXT: {job_description[:2500]}
             # Parse questions
             questions_list = []
             for line in questions_text.split('\n'):
-                clean_line = line.strip()
-                if re.match(r'^\d+\.', clean_line):
-                    q_text = re.sub(r'^\d+\.\s*', '', clean_line)
-                    if q_text:
-                        questions_list.append(q_text)
+                match = _NUMBERED_LINE.match(line.strip())
+                if match and match.group(1):
+                    questions_list.append(match.group(1))
             
             # --- FIX: ENSURE ONLY 10 QUESTIONS ARE PROCESSED ---
             questions_list = questions_list[:10]
@@ -215,12 +464,7 @@ Provide ONLY the recommended answer, no intro or labels.
                     recommended_answer = answer_output['choices'][0]['text'].strip()
                     
                     # Clean up the answer
-                    recommended_answer = re.sub(
-                        r'^(Answer:|Recommended Answer:|Ideal Answer:|Response:)\s*',
-                        '',
-                        recommended_answer,
-                        flags=re.IGNORECASE
-                    )
+                    recommended_answer = _ANSWER_LABEL.sub('', recommended_answer, count=1)
                     print(f"   ✅ Answer generated ({len(recommended_answer)} chars)")
 
                 except Exception as e:
@@ -393,99 +637,100 @@ class EmotionDetector:
         # RAF-DB Specific Labels (based on user info)
         self.labels = ['Surprise', 'Fear', 'Disgust', 'Happy', 'Sad', 'Angry', 'Neutral']
 
-        # Load Haar Cascade
-        # We need the path to the XML file. cv2.data.haarcascades helps find it.
-        try:
-             self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        except Exception:
-             print("⚠️ Warning: Could not load Haar Cascade. Face detection will be skipped.")
-             self.face_cascade = None
+        # Haar Cascade lives in src.utils.frames so each FRAME_POOL thread can load its own copy
+        self.face_cascade = get_face_cascade()
 
     def analyze(self, image_input: Image.Image):
         """
         Input: PIL Image or bytes
         Output: Top emotion classification result from cropped face area
         """
-        model = load_emotion()
-        if not model:
-            return {"error": "Emotion Model not available"}
+        return self.analyze_batch([image_input])[0]
 
-        try:
-            # 1. Convert Input to OpenCV Format (BGR)
-            if isinstance(image_input, bytes):
-                # If raw bytes from file upload
-                nparr = np.frombuffer(image_input, np.uint8)
-                image_cv = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            elif isinstance(image_input, Image.Image):
-                # If PIL Image
-                image_cv = cv2.cvtColor(np.array(image_input), cv2.COLOR_RGB2BGR)
-            else:
-                 return {"error": "Unsupported image format"}
-            
-            if image_cv is None:
-                return {"error": "Could not decode image"}
+    def analyze_batch(self, frames: list) -> list[dict]:
+        """
+        Input: list of PIL Images or bytes
+        Output: one result per frame (same shape as analyze), using a single model forward pass
+        """
+        preprocessed = []
+        for frame in frames:
+            try:
+                preprocessed.append(self._preprocess(frame))
+            except Exception as e:
+                preprocessed.append(e)
+        return self._predict_batch(preprocessed)
+
+    async def preprocess_batch_async(self, frames: list[bytes]) -> list:
+        """Decode + crop frames in FRAME_POOL; each item is a (100, 100, 3) array or the exception for that frame."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            *[loop.run_in_executor(FRAME_POOL, preprocess_frame, frame) for frame in frames],
+            return_exceptions=True,
+        )
 
-            # 2. Face Detection
-            # Convert to grayscale for Haar Cascade
-            gray = cv2.cvtColor(image_cv, cv2.COLOR_BGR2GRAY)
-            
-            faces = []
-            if self.face_cascade:
-                faces = self.face_cascade.detectMultiScale(
-                    gray, 
-                    scaleFactor=1.1, 
-                    minNeighbors=5, 
-                    minSize=(30, 30)
-                )
-
-            # 3. Crop Face (or use full image)
-            if len(faces) > 0:
-                # Use the largest face found
-                (x, y, w, h) = max(faces, key=lambda f: f[2] * f[3])
-                print(f"✅ Face Detected at: x={x}, y={y}, w={w}, h={h}")
-                
-                # Crop logic
-                face_roi = image_cv[y:y+h, x:x+w]
-                face_rgb = cv2.cvtColor(face_roi, cv2.COLOR_BGR2RGB)
-            else:
-                print("⚠️ No face detected. Using full image.")
-                face_rgb = cv2.cvtColor(image_cv, cv2.COLOR_BGR2RGB)
+    async def predict_batch_async(self, preprocessed: list) -> list[dict]:
+        return await asyncio.to_thread(self._predict_batch, preprocessed)
 
-            # 4. Preprocess for Model (100x100, Normalized)
-            target_size = (100, 100)
-            img_resized = cv2.resize(face_rgb, target_size)
-            
-            img_array = img_resized.astype('float32') / 255.0  # Normalize [0,1]
-            img_array = np.expand_dims(img_array, axis=0)      # Add batch dimension -> (1, 100, 100, 3)
+    def _predict_batch(self, preprocessed: list) -> list[dict]:
+        """Input: preprocessed (100, 100, 3) arrays, or the exception raised while preprocessing that frame."""
+        model = load_emotion()
+        if not model:
+            return [{"error": "Emotion Model not available"} for _ in preprocessed]
+
+        results = [None] * len(preprocessed)
+        batch = []
+        positions = []
+        for i, item in enumerate(preprocessed):
+            if isinstance(item, BaseException):
+                results[i] = {"error": str(item)}
+            else:
+                batch.append(item)
+                positions.append(i)
 
-            # 5. Predict
-            predictions = model.predict(img_array, verbose=0)
-            predicted_class_idx = np.argmax(predictions[0])
-            confidence = float(predictions[0][predicted_class_idx])
-            
-            label = self.labels[predicted_class_idx] if predicted_class_idx < len(self.labels) else "Unknown"
+        if not batch:
+            return results
 
-            print(f"✅ Emotion Detected: {label} (conf: {confidence:.4f})")
-            
-            return {
-                "label": label,
-                "score": confidence,
-                "all_scores": {self.labels[i]: float(predictions[0][i]) for i in range(len(self.labels))}
-            }
-                
-        except Exception as e:
-            print(f"❌ Emotion Prediction Failed: {e}")
-            import traceback
-            traceback.print_exc()
-            return {"error": str(e)}
+        try:
+            # 5. Predict the whole batch at once -> (B, 100, 100, 3)
+            predictions = model.predict(np.stack(batch), verbose=0)
+            for i, scores in zip(positions, predictions):
+                results[i] = self._format_prediction(scores)
 
-                
         except Exception as e:
-            print(f"❌ Emotion Prediction Failed: {e}")
+            logger.exception("❌ Emotion Prediction Failed")
             # Fallback for debugging if shape mismatch
             if "shape" in str(e).lower():
-                print("⚠️ Hint: Model input shape mismatch. Try changing target_size to (224, 224).")
-            return {"error": str(e)}
+                logger.warning("⚠️ Hint: Model input shape mismatch. Try changing target_size to (224, 224).")
+            for i in positions:
+                results[i] = {"error": str(e)}
+
+        return results
+
+    def _preprocess(self, image_input) -> np.ndarray:
+        """Decode a frame, crop the largest face and return a normalized (100, 100, 3) array."""
+        if isinstance(image_input, Image.Image):
+            # If PIL Image
+            image_input = cv2.cvtColor(np.array(image_input), cv2.COLOR_RGB2BGR)
+        return preprocess_frame(image_input)
+
+    def _format_prediction(self, scores) -> dict:
+        predicted_class_idx = np.argmax(scores)
+        confidence = float(scores[predicted_class_idx])
+
+        label = self.labels[predicted_class_idx] if predicted_class_idx < len(self.labels) else "Unknown"
+
+        logger.debug("✅ Emotion Detected: %s (conf: %.4f)", label, confidence)
+
+        return {
+            "label": label,
+            "score": confidence,
+            "all_scores": {self.labels[i]: float(scores[i]) for i in range(len(self.labels))}
+        }
+
+@functools.lru_cache(maxsize=1)
+def get_emotion_detector() -> EmotionDetector:
+    """Process-wide EmotionDetector; it holds no per-session state, so every websocket can share it."""
+    return EmotionDetector()
 
 # --- TEST IT ---
 if __name__ == "__main__":
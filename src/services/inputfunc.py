@@ -69,7 +69,6 @@ class InputService:
             cv_text=cv_clean_text     # Storing the extracted text for AI
         )
         db.add(new_cv)
-        db.flush() # this is done to get the id of new_cv before commit
 
         # 3. Save Job Description (Prompt)
         new_prompt = TextPrompts(
@@ -77,17 +76,16 @@ class InputService:
             prompt_text=job_clean_text
         )
         db.add(new_prompt)
-        db.flush() 
+        db.flush() # one flush writes both rows and fills in their ids
+        # ids were assigned by the flush (INSERT ... RETURNING), no refresh needed after commit
+        cv_id, prompt_id = new_cv.id, new_prompt.id
         db.commit()
-
-        db.refresh(new_cv)
-        db.refresh(new_prompt)
         
 
         return {
             "message": "Data stored successfully",
-            "cv_id": new_cv.id,
-            "prompt_id": new_prompt.id,
+            "cv_id": cv_id,
+            "prompt_id": prompt_id,
             "cv_text_length": len(cv_clean_text),
             "cv_text_preview": cv_clean_text[:200] if cv_clean_text else ""
         
@@ -32,7 +32,6 @@ class QuestionsService:
         )
         db.add(new_question)
         db.commit()
-        db.refresh(new_question)
         return {"message": "Question added successfully"}
 
     @staticmethod
@@ -1,240 +1,213 @@
-import base64
-import json
 import asyncio
-import traceback
-from fastapi import HTTPException, Depends, WebSocket, status
+import logging
+import os
+from dataclasses import dataclass, field
+import orjson
+from cachetools import TTLCache
+from fastapi import HTTPException, WebSocket, status
 from fastapi.security import HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from sqlalchemy import text
-from src.models.models import LiveChunksInput, SessionStatus, InterviewSession, User, Transcript, Questions , EmotionAnalysis , Qna_result,Emotion_result
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import insert, select, update, delete, cast, Float
+from src.models.models import LiveChunksInput, SessionStatus, InterviewSession, User, Transcript, Questions , EmotionAnalysis , Qna_result,Emotion_result, Cv
 from src.core.security import get_current_user
-from src.services.aiservices import AudioProcessor, EmotionDetector,unload_whisper,unload_emotion,LLMService
-from starlette.websockets import WebSocketDisconnect, WebSocketState,WebSocket
+from src.db.database import AsyncSessionLocal
+from src.utils.media_store import save_video_frame, delete_session_media, pack_audio_chunk
+from src.utils.frames import average_hash
+from src.services.aiservices import AudioProcessor, EmotionDetector, get_emotion_detector,unload_whisper,unload_emotion,LLMService
+from starlette.websockets import WebSocketDisconnect, WebSocketState
+try:
+    from pybase64 import b64decode # SIMD (AVX2/NEON) decoder, same output as the stdlib one
+except ImportError:
+    from base64 import b64decode
+
+logger = logging.getLogger(__name__)
+
+# Raw chunks are never read back once analysed live; keep them (DB rows + media files) only when asked to
+RETAIN_RAW_MEDIA = os.getenv("RETAIN_RAW_MEDIA", "0") == "1"
+# Live chunks are buffered and written with one executemany + commit per batch
+CHUNK_BATCH_SIZE = int(os.getenv("SESSION_BATCH_SIZE", "20"))
+# ...or once the oldest buffered chunk is this old, so quiet sessions still persist promptly
+CHUNK_FLUSH_INTERVAL_S = int(os.getenv("SESSION_BATCH_MS", "500")) / 1000
+# Rows waiting for the background chunk writer
+CHUNK_WRITE_QUEUE_SIZE = 256
+# Video frames are run through the emotion model up to this many at a time
+EMOTION_BATCH_SIZE = 4
+# Bounded hand-off queues to the per-session inference workers; a full queue pauses the receive loop
+AUDIO_QUEUE_SIZE = 8
+FRAME_QUEUE_SIZE = 16
+# Outbound messages waiting for the per-connection sender task
+SEND_QUEUE_SIZE = 64
+# Frames whose 64-bit average hash differs from the last analysed one by fewer bits are skipped
+DUPLICATE_FRAME_BITS = 5
+# Upper bound on in-flight answer evaluations queued on the LLM service
+LLM_EVAL_CONCURRENCY = 5
+# Binary websocket frames carry raw media: first byte is the type tag, the rest is the payload
+BINARY_FRAME_TYPES = {b"\x01": "audio", b"\x02": "video"}
+# ...except 0x03, whose payload is a control message JSON (same shape as a text frame)
+CONTROL_FRAME_TAG = b"\x03"
+
+# Whisper/emotion models stay loaded between back-to-back sessions; they are unloaded once none has been open this long
+MODEL_IDLE_UNLOAD_S = int(os.getenv("MODEL_IDLE_UNLOAD_S", "300"))
+_live_sessions = 0
+_idle_unloader: asyncio.Task | None = None
+
+# (session_id, user_id) pairs that passed the ownership check, so polling read endpoints skip the SELECT
+_owned_sessions = TTLCache(maxsize=4096, ttl=30)
+
+# Hot-path INSERTs built once and reused, so every execute hits the engine's compiled-statement cache
+LIVECHUNK_INSERT = insert(LiveChunksInput)
+TRANSCRIPT_INSERT = insert(Transcript)
+EMOTION_INSERT = insert(EmotionAnalysis)
+
+@dataclass(slots=True)
+class _SessionState:
+    """Per-connection state shared by the websocket message handlers."""
+    websocket: WebSocket
+    session_id: int
+    processor: AudioProcessor
+    emotion_detector: EmotionDetector
+    chunk_count: int = 0
+    write_queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=CHUNK_WRITE_QUEUE_SIZE)) # LiveChunksInput rows or None to stop
+    question_number: int | None = None # last question announced by the client, used for binary audio frames
+    last_frame_hash: int | None = None # average hash of the last frame sent to the emotion model
+    audio_queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=AUDIO_QUEUE_SIZE)) # (bytes | None, question, chunk) or None to stop
+    frame_queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=FRAME_QUEUE_SIZE)) # frame bytes or None to stop
+    workers: list[asyncio.Task] = field(default_factory=list) # inference tasks, cancelled on disconnect
+    writer: asyncio.Task | None = None # chunk writer, always drained so received chunks are kept
+    send_queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=SEND_QUEUE_SIZE)) # outbound dicts or None to stop
+    sender: asyncio.Task | None = None # only task that writes to the websocket
 
 class SessionService:
     @staticmethod
-    async def create_session(token: HTTPAuthorizationCredentials, db: Session, cv_id: int, prompt_id: int):
+    async def create_session(token: HTTPAuthorizationCredentials, db: AsyncSession, cv_id: int, prompt_id: int):
         user_id = get_current_user(token)
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        new_session = InterviewSession(
-            user_id=user_id,
-            cv_id=cv_id,
-            prompt_id=prompt_id,
-            status=SessionStatus.ONGOING
-        )
-        db.add(new_session)
-        db.commit()
-        db.refresh(new_session)
-        return {"message": "Session created successfully", "session_id": new_session.id}
+        # INSERT ... RETURNING id instead of add + commit + refresh
+        new_session_id = (await db.execute(
+            insert(InterviewSession).values(
+                user_id=user_id,
+                cv_id=cv_id,
+                prompt_id=prompt_id,
+                status=SessionStatus.ONGOING
+            ).returning(InterviewSession.id)
+        )).scalar_one()
+        await db.commit()
+        return {"message": "Session created successfully", "session_id": new_session_id}
 
     @staticmethod
-    async def complete_session(token: HTTPAuthorizationCredentials, db: Session, session_id: int):
+    async def complete_session(token: HTTPAuthorizationCredentials, db: AsyncSession, session_id: int):
         user_id = get_current_user(token)
         
-        session = db.query(InterviewSession).filter(
-            InterviewSession.id == session_id,
-            InterviewSession.user_id == user_id
-        ).first()
+        # Ownership check and status change in one statement: no row comes back unless it was ours
+        updated = await db.scalar(
+            update(InterviewSession)
+            .where(InterviewSession.id == session_id, InterviewSession.user_id == user_id)
+            .values(status=SessionStatus.COMPLETED)
+            .returning(InterviewSession.id)
+        )
         
-        if not session:
+        if updated is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Session not found or you don't have permission"
             )
         
-        session.status = SessionStatus.COMPLETED
-        db.commit()
-        db.refresh(session)
+        await db.commit()
+        _owned_sessions.pop((session_id, user_id), None)
         
+        # values are known locally; reading them off the expired instance would reload the row
         return {
             "message": "Session completed successfully",
-            "session_id": session.id,
-            "status": session.status.value
+            "session_id": session_id,
+            "status": SessionStatus.COMPLETED.value
         }
     
     @staticmethod
-    async def handle_session_websocket(websocket: WebSocket, session_id: int, db: Session):
+    async def handle_session_websocket(websocket: WebSocket, session_id: int):
         await websocket.accept()
         
-        session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+        # No DB session is held for the life of the socket: each write opens a short one from the pool
+        async with AsyncSessionLocal() as db:
+            session = (await db.execute(
+                select(InterviewSession.id, InterviewSession.status).where(InterviewSession.id == session_id)
+            )).first()
         
         if not session:
-            print(f"❌ Session {session_id} not found")
+            logger.warning("❌ Session %s not found", session_id)
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
 
         if session.status != SessionStatus.ONGOING:
-            print(f"❌ Session {session_id} is not ONGOING (status: {session.status})")
+            logger.warning("❌ Session %s is not ONGOING (status: %s)", session_id, session.status)
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
 
-        print(f"✅ Session {session_id} found and ONGOING")
-        processor = AudioProcessor()
-        # emotion_detector = EmotionDetector() # ⚡ MOVED to end of session
-        chunk_count = 0
+        logger.info("✅ Session %s found and ONGOING", session_id)
+        state = _SessionState(
+            websocket=websocket,
+            session_id=session_id,
+            processor=AudioProcessor(),
+            emotion_detector=get_emotion_detector(), # shared detector, reused for every frame
+        )
+        # Inference runs beside the receive loop; the queues give backpressure when it falls behind
+        state.workers = [
+            asyncio.create_task(SessionService._audio_worker(state)),
+            asyncio.create_task(SessionService._frame_worker(state)),
+        ]
+        state.writer = asyncio.create_task(SessionService._chunk_writer(state))
+        state.sender = asyncio.create_task(SessionService._sender(state))
+        SessionService._acquire_models()
         
         try:
             while True:
-                data = await websocket.receive_json() # Let disconnects propagate to outer block
-                print(f"📩 Received: {type(data)} - Keys: {list(data.keys()) if isinstance(data, dict) else 'N/A'}")
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE)) # Let disconnects propagate to outer block
+
+                raw = message.get("bytes")
+                if raw is not None and raw[:1] != CONTROL_FRAME_TAG:
+                    # Binary frame: no JSON/base64 envelope, payload is a zero-copy view of raw[1:]
+                    data = {"type": BINARY_FRAME_TYPES.get(raw[:1])}
+                    payload = memoryview(raw)[1:]
+                else:
+                    # Text frame, or a 0x03 binary frame carrying the same JSON
+                    data = orjson.loads(message["text"] if raw is None else raw[1:])
+                    payload = None
+                    if "question_number" in data and data["question_number"] != state.question_number:
+                        # An utterance never spans two questions: have the audio worker finish the buffered one first
+                        await state.audio_queue.put((None, state.question_number, state.chunk_count))
+                        state.question_number = data["question_number"]
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("📩 Received: %s - Keys: %s", type(data), list(data.keys()) if isinstance(data, dict) else "N/A")
                 
       
-                if "type" in data:
-                    msg_type = data.get("type")
-                    msg_data = data.get("data")
-                    
-                    print(f"📨 Message type: {msg_type}")
-
-                    if msg_type == "audio":
-                        try:
-                            
-                            audio_bytes = base64.b64decode(msg_data)
-                            print(f"✅ Decoded audio: {len(audio_bytes)} bytes")
-                        except Exception as e:
-                            print(f"❌ Base64 Decode Error: {e}")
-                            await websocket.send_json({"error": f"Base64 decode failed: {str(e)}"})
-                            continue
-
-                        # Store audio chunk
-                        try:
-                            new_chunk = LiveChunksInput(
-                                session_id=session_id,
-                                audio_chunk=audio_bytes,
-                                video_chunk=None,
-                            )
-                            db.add(new_chunk)
-                            db.flush()
-                            db.commit()
-                            db.refresh(new_chunk)
-                            chunk_count += 1
-                            print(f"✅ Audio chunk #{chunk_count} STORED with ID={new_chunk.id} ({len(audio_bytes)} bytes)")
-                            
-                        except Exception as e:
-                            db.rollback()
-                            print(f"❌ Database Error storing audio: {type(e).__name__}: {e}")
-                            print(f"❌ Traceback:\n{traceback.format_exc()}")
-                            continue
-
-                        # Process audio for transcription
-                        try:
-                            question_id = data.get("question_number", None)
-                            transcription = await processor.process_audio(audio_bytes)
-                            if transcription and len(transcription.strip()) > 0:
-                                new_transcript = Transcript(
-                                    session_id=session_id,
-                                    user_response=transcription,
-                                    is_ai_response=False,
-                                    question_id=question_id
-                                )
-                                db.add(new_transcript)
-                                db.flush()
-                                db.commit()
-                                print(f"✅ Transcript STORED: {transcription[:80]}...")
-                                
-                                await websocket.send_json({
-                                    "type": "transcription",
-                                    "data": transcription,
-                                    "chunk_number": chunk_count
-                                })
-                                print(f"transcript sent = {transcription}")
-                        except Exception as e:
-                            db.rollback()
-                            print(f"❌ Transcription error: {e}")
-
-                    
-                    elif msg_type == "video":
-                        try:
-                            video_bytes = base64.b64decode(msg_data)
-                            
-                            new_chunk = LiveChunksInput(
-                                session_id=session_id,
-                                audio_chunk=None,
-                                video_chunk=video_bytes
-                            )
-                            db.add(new_chunk)
-                            db.flush()
-                            db.commit()
-                            chunk_count += 1
-                            
-                            
-                            emotion_detector = EmotionDetector() 
-                            analysis_result = emotion_detector.analyze(video_bytes)
-                            
-   
-                            new_analysis = EmotionAnalysis(
-                                session_id=session_id,
-                                emotion_label=analysis_result['label'],
-                                emotion_score=str(analysis_result['score'])
-                            )
-                            db.add(new_analysis)
-                            db.commit()
-
-                            from starlette.websockets import WebSocketState as WSState
-                            if websocket.client_state == WSState.CONNECTED:
-                                await websocket.send_json({
-                                    "type": "live_emotion_analysis",
-                                    "data": analysis_result,
-                                    "chunk_number": chunk_count
-                                })
-                        except Exception as e:
-                            db.rollback()
-                            print(f"❌ Video analysis/storage error: {e}")
-
-                    # ----- SESSION COMPLETE -----
-                    elif msg_type == "session_complete" or msg_type == "end_interview":
-                        print(f"🛑 Session Complete received. Total chunks: {chunk_count}")
-                        
-                        session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
-                        if session:
-                            session.status = SessionStatus.COMPLETED
-                            db.commit()
-
-                        # 🏁 CLEANUP: Unload models now that session is done
-                        unload_whisper()
-                        unload_emotion()
-                        
-                        
-
-                        return {"message": "Session complete", "session_id": session_id}
-                    else:
-                        print(f"⚠️ Unknown message type: {msg_type}")
-
-          
+                msg_type = data.get("type")
+                if msg_type is not None:
+                    logger.debug("📨 Message type: %s", msg_type)
+                    handler = _MESSAGE_HANDLERS.get(msg_type)
+                    if handler is None:
+                        logger.warning("⚠️ Unknown message type: %s", msg_type)
+                        continue
+                    result = await handler(state, data, payload)
+                    if result is not None:
+                        return result # session finished
+
                 elif "bytes" in data:
-                    try:
-                        audio_bytes = base64.b64decode(data["bytes"])
-                        print(f"✅ Decoded audio (legacy): {len(audio_bytes)} bytes")
-                        
-                        new_chunk = LiveChunksInput(
-                            session_id=session_id,
-                            audio_chunk=audio_bytes,
-                            video_chunk=None
-                        )
-                        db.add(new_chunk)
-                        db.flush()
-                        db.commit()
-                        db.refresh(new_chunk)
-                        chunk_count += 1
-                        print(f"✅ Audio chunk #{chunk_count} STORED (legacy)")
-                        
-                    except Exception as e:
-                        db.rollback()
-                        print(f"❌ Legacy audio error: {e}")
+                    await SessionService._handle_legacy_audio(state, data)
 
                 else:
-                    print(f"⚠️ Unknown message format: {list(data.keys())}")
+                    logger.warning("⚠️ Unknown message format: %s", list(data.keys()))
                 
 
 
         except WebSocketDisconnect:
-            print(f"⚠️ Client disconnected from session {session_id}. Total chunks: {chunk_count}")
+            logger.info("⚠️ Client disconnected from session %s. Total chunks: %d", session_id, state.chunk_count)
             
-        except Exception as e:
-            print(f"❌ Critical error: {type(e).__name__}: {e}")
-            print(f"❌ Traceback:\n{traceback.format_exc()}")
+        except Exception:
+            logger.exception("❌ Critical error in session %s websocket", session_id)
             if websocket.client_state == WebSocketState.CONNECTED:
                 try:
                     await websocket.close(code=1011)
@@ -242,24 +215,381 @@ class SessionService:
                     pass
                 
         finally:
-            if websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await SessionService._drain_audio(state)
+            finally:
+                SessionService._release_models()
+                for worker in state.workers:
+                    worker.cancel()
+                await asyncio.gather(*state.workers, return_exceptions=True)
+                state.sender.cancel()
+                if not state.writer.done():
+                    await state.write_queue.put(None)
+                    await state.writer
+                if websocket.client_state == WebSocketState.CONNECTED:
+                    try:
+                        await websocket.close()
+                    except RuntimeError:
+                        pass
+
+    @staticmethod
+    async def _drain_audio(state: "_SessionState"):
+        """On disconnect/error, transcribe the queued audio and the utterance in progress instead of dropping them."""
+        audio_worker = state.workers[0]
+        if audio_worker.done():
+            return # session_complete already drained it
+        # Flush marker for the buffered utterance, then the stop marker; the worker stores what it transcribes
+        await state.audio_queue.put((None, state.question_number, state.chunk_count))
+        await state.audio_queue.put(None)
+        try:
+            await audio_worker
+        except Exception:
+            logger.exception("❌ Failed to transcribe pending audio for session %s", state.session_id)
+
+    @staticmethod
+    def _acquire_models():
+        """Count a live session and cancel any pending idle unload."""
+        global _live_sessions, _idle_unloader
+        _live_sessions += 1
+        if _idle_unloader is not None:
+            _idle_unloader.cancel()
+            _idle_unloader = None
+
+    @staticmethod
+    def _release_models():
+        """Drop a live session; the last one out schedules the idle unload."""
+        global _live_sessions, _idle_unloader
+        _live_sessions -= 1
+        if _live_sessions == 0 and _idle_unloader is None:
+            _idle_unloader = asyncio.create_task(SessionService._unload_models_when_idle())
+
+    @staticmethod
+    async def _unload_models_when_idle():
+        global _idle_unloader
+        await asyncio.sleep(MODEL_IDLE_UNLOAD_S)
+        _idle_unloader = None
+        if _live_sessions == 0:
+            # 🏁 CLEANUP: no session has needed the models for a while
+            logger.info("🧹 No live sessions for %ds, unloading models", MODEL_IDLE_UNLOAD_S)
+            unload_whisper()
+            unload_emotion()
+
+    @staticmethod
+    async def _decode_media(state: "_SessionState", data: dict) -> bytes | None:
+        """Base64 payload of a JSON audio/video message; a malformed one is reported to the client and None returned."""
+        try:
+            return b64decode(data.get("data"), validate=False)
+        except (ValueError, TypeError) as e:
+            # Bad base64 / missing data: the chunk is dropped, the session carries on
+            logger.warning("❌ Malformed %s message: %s", data.get("type"), e)
+            await state.send_queue.put({"error": f"Base64 decode failed: {str(e)}"})
+            return None
+
+    @staticmethod
+    async def _handle_audio(state: "_SessionState", data: dict, payload: memoryview | None):
+        audio_bytes = payload if payload is not None else await SessionService._decode_media(state, data)
+        if audio_bytes is None:
+            return None
+        logger.debug("✅ Decoded audio: %d bytes", len(audio_bytes))
+
+        if RETAIN_RAW_MEDIA:
+            # Buffer audio chunk, written in batches
+            await state.write_queue.put({
+                "session_id": state.session_id,
+                "audio_chunk": audio_bytes,
+                "video_chunk": None,
+                "video_uri": None,
+            })
+        state.chunk_count += 1
+        logger.debug("✅ Audio chunk #%d buffered (%d bytes)", state.chunk_count, len(audio_bytes))
+
+        # Transcription happens in _audio_worker (text comes back only once an utterance ends)
+        await state.audio_queue.put((audio_bytes, state.question_number, state.chunk_count))
+
+    @staticmethod
+    async def _handle_video(state: "_SessionState", data: dict, payload: memoryview | None):
+        # preprocess_frame and the media store take real bytes rather than a view
+        video_bytes = bytes(payload) if payload is not None else await SessionService._decode_media(state, data)
+        if video_bytes is None:
+            return None
+        if RETAIN_RAW_MEDIA:
+            try:
+                # Frames go to the media store; the row only references them
+                video_uri = await asyncio.to_thread(save_video_frame, state.session_id, video_bytes)
+                
+                await state.write_queue.put({
+                    "session_id": state.session_id,
+                    "audio_chunk": None,
+                    "video_chunk": None,
+                    "video_uri": video_uri,
+                })
+            except OSError:
+                logger.exception("❌ Video storage error")
+        state.chunk_count += 1
+
+        await state.frame_queue.put(video_bytes)
+
+    @staticmethod
+    async def _handle_session_complete(state: "_SessionState", data: dict, payload: memoryview | None):
+        session_id = state.session_id
+        logger.info("🛑 Session Complete received. Total chunks: %d", state.chunk_count)
+        # Let the workers finish everything already queued before the final write
+        await state.audio_queue.put(None)
+        await state.frame_queue.put(None)
+        await state.write_queue.put(None)
+        await asyncio.gather(*state.workers, state.writer)
+
+        transcription = await state.processor.flush()
+
+        # Final transcript and the status change go out as one transaction; the client hears about either only once it commits
+        async with AsyncSessionLocal() as db:
+            try:
+                transcript_message = await SessionService._store_transcript(state, state.question_number, transcription, state.chunk_count, db=db)
+                await db.execute(
+                    update(InterviewSession)
+                    .where(InterviewSession.id == session_id)
+                    .values(status=SessionStatus.COMPLETED)
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                logger.exception("❌ Failed to complete session %s", session_id)
+                await state.send_queue.put({"error": "Failed to complete the interview, please end it again"})
+                await state.send_queue.put(None)
+                await state.sender
+                return {"message": "Session completion failed", "session_id": session_id}
+
+        if transcript_message is not None:
+            await state.send_queue.put(transcript_message)
+        await state.send_queue.put({"type": "status", "data": "Interview Completed", "total_chunks": state.chunk_count})
+        await state.send_queue.put(None)
+        await state.sender
+
+        return {"message": "Session complete", "session_id": session_id}
+
+    @staticmethod
+    async def _handle_question(state: "_SessionState", data: dict, payload: memoryview | None):
+        return None # control frame; question_number is recorded by the receive loop
+
+    @staticmethod
+    async def _handle_legacy_audio(state: "_SessionState", data: dict):
+        try:
+            audio_bytes = b64decode(data["bytes"], validate=False)
+            logger.debug("✅ Decoded audio (legacy): %d bytes", len(audio_bytes))
+            
+            if RETAIN_RAW_MEDIA:
+                await state.write_queue.put({
+                    "session_id": state.session_id,
+                    "audio_chunk": audio_bytes,
+                    "video_chunk": None,
+                    "video_uri": None,
+                })
+            state.chunk_count += 1
+            logger.debug("✅ Audio chunk #%d buffered (legacy)", state.chunk_count)
+            
+        except Exception:
+            logger.exception("❌ Legacy audio error")
+
+    @staticmethod
+    async def _audio_worker(state: "_SessionState"):
+        """Transcribe queued audio in order. A None chunk flushes the current utterance; a None item stops the worker."""
+        while True:
+            item = await state.audio_queue.get()
+            if item is None:
+                return
+            audio_bytes, question_number, chunk_count = item
+            try:
+                # Hypotheses go straight to the client; only the final text of an utterance is stored
+                async for is_final, chunk_text in state.processor.stream(audio_bytes):
+                    if is_final:
+                        await SessionService._store_transcript(state, question_number, chunk_text, chunk_count)
+                    elif chunk_text.strip():
+                        await state.send_queue.put({
+                            "type": "hypothesis",
+                            "data": chunk_text,
+                            "chunk_number": chunk_count
+                        })
+            except Exception:
+                logger.exception("❌ Transcription error")
+
+    @staticmethod
+    async def _frame_worker(state: "_SessionState"):
+        """Run whatever frames are queued (up to EMOTION_BATCH_SIZE) through the emotion model together. None stops the worker."""
+        while True:
+            frame = await state.frame_queue.get()
+            if frame is None:
+                return
+            frames = [frame]
+            stop = False
+            while len(frames) < EMOTION_BATCH_SIZE and not state.frame_queue.empty():
+                frame = state.frame_queue.get_nowait()
+                if frame is None:
+                    stop = True
+                    break
+                frames.append(frame)
+            await SessionService._analyze_frames(state, frames)
+            if stop:
+                return
+
+    @staticmethod
+    async def _sender(state: "_SessionState"):
+        """Drain send_queue to the websocket so workers never wait on the network. None stops the sender."""
+        while True:
+            batch = [await state.send_queue.get()]
+            # Take everything already queued so a burst goes out without a queue wait per message
+            while not state.send_queue.empty():
+                batch.append(state.send_queue.get_nowait())
+            stop = None in batch
+            if stop:
+                batch = batch[:batch.index(None)]
+            if state.websocket.client_state == WebSocketState.CONNECTED:
+                # Sent in order, not gathered: hypotheses must reach the client before their transcription
+                for message in batch:
+                    try:
+                        await SessionService._send_json(state.websocket, message)
+                        logger.debug("📤 Sent %s", message.get("type", "error"))
+                    except Exception:
+                        logger.exception("❌ Websocket send error")
+            if stop:
+                return
+
+    @staticmethod
+    async def _send_json(websocket: WebSocket, payload: dict):
+        """send_json with orjson instead of the stdlib encoder used by Starlette."""
+        await websocket.send_text(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY).decode())
+
+    @staticmethod
+    async def _chunk_writer(state: "_SessionState"):
+        """Bulk insert queued chunk rows: up to CHUNK_BATCH_SIZE per batch, waiting at most CHUNK_FLUSH_INTERVAL_S to fill one. None stops the writer."""
+        loop = asyncio.get_running_loop()
+        while True:
+            row = await state.write_queue.get()
+            if row is None:
+                return
+            batch = [row]
+            stop = False
+            deadline = loop.time() + CHUNK_FLUSH_INTERVAL_S
+            while len(batch) < CHUNK_BATCH_SIZE:
                 try:
-                    await websocket.close()
-                except RuntimeError:
-                    pass
+                    row = await asyncio.wait_for(state.write_queue.get(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                batch.append(row)
+            await SessionService._flush_chunks(batch)
+            if stop:
+                return
+
+    @staticmethod
+    async def _flush_chunks(pending_chunks: list[dict]):
+        """Write buffered LiveChunksInput rows with a single bulk insert and commit."""
+        if not pending_chunks:
+            return
+        try:
+            # Compression runs in a worker thread (zstd releases the GIL), not on the event loop
+            await asyncio.to_thread(SessionService._pack_audio_rows, pending_chunks)
+            async with AsyncSessionLocal() as db:
+                await db.execute(LIVECHUNK_INSERT, pending_chunks)
+                await db.commit()
+        except SQLAlchemyError:
+            logger.exception("❌ Database Error storing %d chunks", len(pending_chunks))
+        except Exception:
+            # Compression / media errors must not kill the writer, or producers block on a full write_queue
+            logger.exception("❌ Error storing %d chunks", len(pending_chunks))
+        finally:
+            pending_chunks.clear()
+
+    @staticmethod
+    def _pack_audio_rows(rows: list[dict]):
+        for row in rows:
+            if row["audio_chunk"] is not None:
+                row["audio_chunk"] = pack_audio_chunk(row["audio_chunk"])
+
     @staticmethod
-    async def fetch_session_analysis(token: HTTPAuthorizationCredentials, db: Session, session_id: int):
+    async def _store_transcript(state: "_SessionState", question_id: int | None, transcription: str, chunk_count: int, db: AsyncSession | None = None):
+        """
+        Persist a finished utterance and push it to the client.
+        With db given, the caller owns the transaction: errors propagate, nothing is sent, and the
+        returned message is for the caller to queue once it has committed.
+        """
+        if not transcription or not transcription.strip():
+            return None
+        # Core insert: no ORM object, identity map or unit-of-work flush for a write-only row
+        new_transcript = {
+            "session_id": state.session_id,
+            "user_response": transcription,
+            "is_ai_response": False,
+            "question_id": question_id,
+        }
+        message = {
+            "type": "transcription",
+            "data": transcription,
+            "chunk_number": chunk_count
+        }
+        if db is not None:
+            await db.execute(TRANSCRIPT_INSERT, new_transcript)
+            return message
+        try:
+            async with AsyncSessionLocal() as own_db:
+                await own_db.execute(TRANSCRIPT_INSERT, new_transcript)
+                await own_db.commit()
+            logger.debug("✅ Transcript STORED: %.80s...", transcription)
+
+            await state.send_queue.put(message)
+        except Exception:
+            logger.exception("❌ Transcription error")
+        return None
+
+    @staticmethod
+    async def _analyze_frames(state: "_SessionState", frames: list[bytes]):
+        """Run a batch of video frames through the emotion model, then store and push the results."""
+        if not frames:
+            return
+        try:
+            # Decoding runs in the frame process pool, inference in a worker thread
+            preprocessed = await state.emotion_detector.preprocess_batch_async(frames)
+            distinct = []
+            for face in preprocessed:
+                if not isinstance(face, BaseException):
+                    face_hash = average_hash(face)
+                    if state.last_frame_hash is not None and (face_hash ^ state.last_frame_hash).bit_count() < DUPLICATE_FRAME_BITS:
+                        continue # near-duplicate of the last analysed frame, its emotion still stands
+                    state.last_frame_hash = face_hash
+                distinct.append(face)
+            if not distinct:
+                return
+            analysis_results = await state.emotion_detector.predict_batch_async(distinct)
+            analysis_results = [r for r in analysis_results if "error" not in r]
+
+            if analysis_results:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(EMOTION_INSERT, [
+                        {
+                            "session_id": state.session_id,
+                            "emotion_label": analysis_result['label'],
+                            "emotion_score": str(analysis_result['score'])
+                        } for analysis_result in analysis_results
+                    ])
+                    await db.commit()
+
+            for analysis_result in analysis_results:
+                await state.send_queue.put({
+                    "type": "live_emotion_analysis",
+                    "data": analysis_result,
+                    "chunk_number": state.chunk_count
+                })
+        except Exception:
+            logger.exception("❌ Video analysis/storage error")
+
+    @staticmethod
+    async def fetch_session_analysis(token: HTTPAuthorizationCredentials, db: AsyncSession, session_id: int):
         user_id = get_current_user(token)
-        session = db.query(InterviewSession).filter(
-            InterviewSession.id == session_id, 
-            InterviewSession.user_id == user_id
-        ).first()
-        
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
+        await SessionService._ensure_session_owner(db, session_id, user_id)
 
-        emotionl_result = db.query(Emotion_result).filter(Emotion_result.session_id == session_id).first()
-        qna_results = db.query(Qna_result).filter(Qna_result.session_id == session_id).all()
+        emotionl_result = await db.scalar(select(Emotion_result).where(Emotion_result.session_id == session_id))
+        qna_results = (await db.scalars(select(Qna_result).where(Qna_result.session_id == session_id))).all()
 
         if not emotionl_result or not qna_results:
             raise HTTPException(status_code=404, detail="Analysis not found for this session")
@@ -270,39 +600,39 @@ class SessionService:
         }
 
     @staticmethod
-    async def fetch_session_transcript(token: HTTPAuthorizationCredentials, db: Session, session_id:int):
+    async def fetch_session_transcript(token: HTTPAuthorizationCredentials, db: AsyncSession, session_id:int):
         user_id = get_current_user(token)
-        session = db.query(InterviewSession).filter(
-            InterviewSession.id == session_id, 
-            InterviewSession.user_id == user_id
-        ).first()
-        
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
 
-        transcripts = db.query(Transcript).filter(
-            Transcript.session_id == session_id
-        ).order_by(Transcript.created_at).all()
+        # One round-trip: the outer join yields a row for an owned session even when it has no transcripts
+        rows = (await db.execute(
+            select(Transcript.id, Transcript.user_response, Transcript.question_id)
+            .select_from(InterviewSession)
+            .outerjoin(Transcript, Transcript.session_id == InterviewSession.id)
+            .where(InterviewSession.id == session_id, InterviewSession.user_id == user_id)
+            .order_by(Transcript.created_at)
+        )).all()
+        if not rows:
+            raise HTTPException(status_code=404, detail="Session not found")
 
+        # Only the columns the response uses; an owned session without transcripts gives one all-NULL row
         return {
-            "transcripts": [{"response": t.user_response, "question_id": t.question_id} for t in transcripts]
+            "transcripts": [{"response": t.user_response, "question_id": t.question_id} for t in rows if t.id is not None]
         }
     
     @staticmethod
-    async def fetch_session_questions(token: HTTPAuthorizationCredentials, db: Session, session_id: int):
+    async def fetch_session_questions(token: HTTPAuthorizationCredentials, db: AsyncSession, session_id: int):
         user_id = get_current_user(token)
-        
-        session = db.query(InterviewSession).filter(
-            InterviewSession.id == session_id,
-            InterviewSession.user_id == user_id
-        ).first()
-        
-        if not session:
+
+        rows = (await db.execute(
+            select(Questions.id, Questions.question_text, Questions.difficulty_level, Questions.created_at)
+            .select_from(InterviewSession)
+            .outerjoin(Questions, Questions.session_id == InterviewSession.id)
+            .where(InterviewSession.id == session_id, InterviewSession.user_id == user_id)
+            .order_by(Questions.order)
+        )).all()
+        if not rows:
             raise HTTPException(status_code=404, detail="Session not found")
-        
-        questions = db.query(Questions).filter(
-            Questions.session_id == session_id
-        ).order_by(Questions.order).all()
+        questions = [q for q in rows if q.id is not None]
         
         return {
             "questions": [
@@ -316,49 +646,77 @@ class SessionService:
         }
     
     @staticmethod
-    async def terminate_session(token: HTTPAuthorizationCredentials, db: Session, session_id: int):
+    async def terminate_session(token: HTTPAuthorizationCredentials, db: AsyncSession, session_id: int):
         user_id = get_current_user(token)
         
-        session = db.query(InterviewSession).filter(
-            InterviewSession.id == session_id,
-            InterviewSession.user_id == user_id
-        ).first()
+        updated = await db.scalar(
+            update(InterviewSession)
+            .where(InterviewSession.id == session_id, InterviewSession.user_id == user_id)
+            .values(status=SessionStatus.TERMINATED)
+            .returning(InterviewSession.id)
+        )
         
-        if not session:
+        if updated is None:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        session.status = SessionStatus.TERMINATED
-        db.commit()
+        await db.commit()
+        _owned_sessions.pop((session_id, user_id), None)
         
         return {"message": "Session terminated successfully"}
     
     @staticmethod
-    async def delete_session(token: HTTPAuthorizationCredentials, db: Session, session_id: int):
+    async def delete_session(token: HTTPAuthorizationCredentials, db: AsyncSession, session_id: int):
         user_id = get_current_user(token)
-        user = db.query(User).filter(User.id == user_id).first()
-        if user.role != "admin":
+        user = await db.get(User, user_id)
+        if not user or user.role != "admin":
             raise HTTPException(status_code=403, detail="Only admin can delete sessions")
-        session = db.query(InterviewSession).filter(
-            InterviewSession.id == session_id,
-        ).first()
+        # One DELETE; child rows go with it through their ON DELETE CASCADE foreign keys
+        deleted = await db.scalar(
+            delete(InterviewSession)
+            .where(InterviewSession.id == session_id)
+            .returning(InterviewSession.id)
+        )
         
-        if not session:
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        db.delete(session)
-        db.commit()
+        await db.commit()
+        await asyncio.to_thread(delete_session_media, session_id)
+        for key in [k for k in _owned_sessions if k[0] == session_id]:
+            _owned_sessions.pop(key, None)
         
         return {"message": "Session deleted successfully"}
+
+    @staticmethod
+    async def _ensure_session_owner(db: AsyncSession, session_id: int, user_id: int):
+        """Raise 404 unless the session belongs to the user; positive results are cached for a short TTL."""
+        key = (session_id, user_id)
+        if key in _owned_sessions:
+            return
+        owned = await db.scalar(select(
+            select(InterviewSession.id).where(
+                InterviewSession.id == session_id,
+                InterviewSession.user_id == user_id
+            ).exists()
+        ))
+        if not owned:
+            raise HTTPException(status_code=404, detail="Session not found")
+        _owned_sessions[key] = True
     
 
     @staticmethod
-    async def analyse_session(token: HTTPAuthorizationCredentials, db: Session, session_id: int):
+    async def analyse_session(token: HTTPAuthorizationCredentials, db: AsyncSession, session_id: int):
 
         user_id = get_current_user(token)
-        session = db.query(InterviewSession).filter(
-            InterviewSession.id == session_id,
-            InterviewSession.user_id == user_id
-        ).first()
+        # Only the CV text is needed from the session, so no ORM objects are loaded for the check
+        session = (await db.execute(
+            select(InterviewSession.id, Cv.cv_text)
+            .outerjoin(Cv, Cv.id == InterviewSession.cv_id)
+            .where(
+                InterviewSession.id == session_id,
+                InterviewSession.user_id == user_id
+            )
+        )).first()
 
         if not session:
             raise HTTPException(status_code=404, detail="Session not found or unauthorized")
@@ -371,43 +729,64 @@ class SessionService:
             llmservice.install_model(instruction="llm")
 
             
-            unique_qids = {t.question_id for t in session.transcripts if t.question_id is not None}
-            for qid in unique_qids:
-                question = db.query(Questions).filter(Questions.id == qid).first()
-                transcript = db.query(Transcript).filter(
-                    Transcript.question_id == qid, 
-                    Transcript.session_id == session_id
-                ).first()
-                
-                if question and transcript:
-                    cv_content = session.cv.cv_text if session.cv else "No CV provided"
-                    
-                    eval_result = await llmservice.evaluate_candidate_response(
+            # One joined query instead of a Questions + Transcript lookup per question
+            answered = (await db.execute(
+                select(Questions, Transcript)
+                .join(Transcript, Transcript.question_id == Questions.id)
+                .where(Transcript.session_id == session_id)
+                .order_by(Transcript.id)
+            )).all()
+            first_answers = {}
+            for question, transcript in answered:
+                first_answers.setdefault(question.id, (question, transcript))
+
+            cv_content = session.cv_text if session.cv_text is not None else "No CV provided"
+            eval_slots = asyncio.Semaphore(LLM_EVAL_CONCURRENCY)
+
+            async def evaluate(qid, question, transcript):
+                async with eval_slots:
+                    return await llmservice.evaluate_candidate_response(
                         q_id=qid,
                         question=question.question_text,
                         recommended_answer=question.recommended_answer or "No ideal answer provided",
                         candidate_response=transcript.user_response,
                         cv_text=cv_content
                     )
-                    
-                    qna_result = Qna_result(
-                        session_id=session_id,
-                        question_id=qid,
-                        score=eval_result.get('score', 0),
-                        feedback=eval_result.get('feedback', ''),
-                        strength=", ".join(eval_result.get('strengths', [])),
-                        weakness=", ".join(eval_result.get('improvements', []))
-                    )
-                    db.add(qna_result)
+
+            # One failed evaluation should not discard the others
+            eval_results = await asyncio.gather(*[
+                evaluate(qid, question, transcript)
+                for qid, (question, transcript) in first_answers.items()
+            ], return_exceptions=True)
+
+            qna_rows = []
+            for qid, eval_result in zip(first_answers, eval_results):
+                if isinstance(eval_result, BaseException):
+                    logger.error("❌ Evaluation failed for question %s", qid, exc_info=eval_result)
+                    continue
+                qna_rows.append({
+                    "session_id": session_id,
+                    "question_id": qid,
+                    "score": eval_result.get('score', 0),
+                    "feedback": eval_result.get('feedback', ''),
+                    "strength": ", ".join(eval_result.get('strengths', [])),
+                    "weakness": ", ".join(eval_result.get('improvements', []))
+                })
+
+            if qna_rows:
+                await db.execute(insert(Qna_result), qna_rows)
 
             # 4. Overall Emotion Result (Fetched from DB records saved during live session)
-            emotion_records = db.query(EmotionAnalysis).filter(EmotionAnalysis.session_id == session_id).all()
+            # The strongest reading is picked by the database, so no per-frame rows come back at all
+            strongest = (await db.execute(
+                select(EmotionAnalysis.emotion_label, cast(EmotionAnalysis.emotion_score, Float).label("score"))
+                .where(EmotionAnalysis.session_id == session_id)
+                .order_by(cast(EmotionAnalysis.emotion_score, Float).desc())
+                .limit(1)
+            )).first()
+            overall_emotion = {"label": strongest.emotion_label, "score": strongest.score} if strongest else None
             
-            if emotion_records:
-                # Reconstruct 'results' list from DB records
-                results = [{"label": r.emotion_label, "score": float(r.emotion_score)} for r in emotion_records]
-                overall_emotion = max(results, key=lambda x: x['score'])
-                
+            if overall_emotion:
                 emo_eval = llmservice.evaluate_emotion(
                     emotion_label=[overall_emotion['label']], 
                     confidence_score=[overall_emotion['score']]
@@ -426,13 +805,22 @@ class SessionService:
                 db.add(emotion_result)
 
             # 5. Final Commit and Unload
-            db.commit()
+            await db.commit()
             llmservice.install_model(instruction="unload")
             
             return {"status": "success", "message": "Analysis completed and saved"}
 
         except Exception as e:
-            db.rollback()
-            print(f"❌ Analysis failed: {e}")
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
\ No newline at end of file
+            await db.rollback()
+            logger.exception("❌ Analysis failed for session %s", session_id)
+            raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+
+# msg_type -> handler; a handler returning a value ends the websocket session
+_MESSAGE_HANDLERS = {
+    "audio": SessionService._handle_audio,
+    "video": SessionService._handle_video,
+    "session_complete": SessionService._handle_session_complete,
+    "end_interview": SessionService._handle_session_complete,
+    "question": SessionService._handle_question,
+}
@@ -1,130 +1,133 @@
 from fastapi import HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
+import asyncio
+import functools
+import os
 import random
 from pypdf import PdfReader
 import re
 
-class TipsForInterviewService:
+TIPS_PDF_PATH = "/Users/manishsubedi/Documents/coding/Intraviewer/backend/100_hacks.pdf"
 
-    @staticmethod
-    def get_random_tips(token: HTTPAuthorizationCredentials):
-        file_path = "/Users/manishsubedi/Documents/coding/Intraviewer/backend/100_hacks.pdf"
-        try:
-            reader = PdfReader(file_path)
-            full_text = ""
-            for page in reader.pages:
-                full_text += page.extract_text() + "\n"
-            
-            # --- Parsing Logic ---
-            lines = full_text.split('\n')
+# Regex to find "1. Tip Text", "11. Tip Text" etc.
+_TIP_PATTERN = re.compile(r'^\s*(\d+)\.\s+(.*)')
+
+# Icons or headers from your PDF content
+_TOPIC_INDICATORS = [
+    "Automatic Zoom", 
+    "Mindset & Psychology", 
+    "Pre-Interview Recon", 
+    "The Virtual Setup", 
+    "Answering Strategy & Delivery", 
+    "Technical & Engineering Interviews", 
+    "Academic & Advanced Degree Hacks", 
+    "Body Language & Non-Verbal Data"
+]
+# One alternation instead of testing each indicator against every line
+_TOPIC_RE = re.compile("|".join(map(re.escape, _TOPIC_INDICATORS)))
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_tips(file_path: str, mtime: float) -> list[tuple[str, str, str]]:
+    """Parse the tips PDF into a flat [(topic, id, tip)] list; cached until the file's mtime changes."""
+    reader = PdfReader(file_path)
+    full_text = "\n".join(page.extract_text() for page in reader.pages)
+    
+    # --- Parsing Logic ---
+    lines = full_text.splitlines()
+    
+    topics = {}
+    current_topic = "General Tips" # Default topic
+    
+    match_tip, search_tip, find_topic = _TIP_PATTERN.match, _TIP_PATTERN.search, _TOPIC_RE.search
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # 1. Check for Topic Header
+        # If line matches one of our known topics loosely
+        if find_topic(line):
+            current_topic = line # Use the actual line as the topic name
+            if current_topic not in topics:
+                topics[current_topic] = []
+            continue
+
+        # 2. Check for Tip (e.g., "1. The Colleague Frame...")
+        match = match_tip(line)
+        if match:
+            tip_number = match.group(1)
+            tip_content = match.group(2)
             
-            topics = {}
-            current_topic = "General Tips" # Default topic
+            if current_topic not in topics:
+                topics[current_topic] = []
             
-            # Regex to find "1. Tip Text", "11. Tip Text" etc.
-            tip_pattern = re.compile(r'^\s*(\d+)\.\s+(.*)')
+            # Store current tip
+            topics[current_topic].append({
+                "id": tip_number,
+                "tip": tip_content
+            })
             
-            # Icons or headers from your PDF content
-            topic_indicators = [
-                "Automatic Zoom", 
-                "Mindset & Psychology", 
-                "Pre-Interview Recon", 
-                "The Virtual Setup", 
-                "Answering Strategy & Delivery", 
-                "Technical & Engineering Interviews", 
-                "Academic & Advanced Degree Hacks", 
-                "Body Language & Non-Verbal Data"
-            ]
-
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # 1. Check for Topic Header
-                # If line matches one of our known topics loosely
-                is_header = False
-                for indicator in topic_indicators:
-                    if indicator in line:
-                        current_topic = line # Use the actual line as the topic name
-                        if current_topic not in topics:
-                            topics[current_topic] = []
-                        is_header = True
-                        break
+            # Special check: Sometimes multiple short tips are on one line in PDF (e.g. "90. Next Steps...")
+            # We check if 'tip_content' ITSELF contains another numbered tip like "90. Next Steps..."
+            secondary_match = search_tip(tip_content)
+            if secondary_match:
+                # Find where the second tip starts
+                start_idx = secondary_match.start()
+                
+                # 1. Update the FIRST tip to end before the second one starts
+                first_tip_text = tip_content[:start_idx].strip()
+                topics[current_topic][-1]["tip"] = first_tip_text
+                
+                # 2. Add the SECOND tip as a new entry
+                second_tip_number = secondary_match.group(1)
+                second_tip_text = secondary_match.group(2)
+                
+                topics[current_topic].append({
+                    "id": second_tip_number,
+                    "tip": second_tip_text
+                })
+        else:
+            # 3. Handle multi-line tips
+            # If line is NOT a header and NOT a new tip, append to previous tip
+            if current_topic in topics and topics[current_topic]:
+                last_tip = topics[current_topic][-1]
                 
-                if is_header:
-                    continue
-
-                # 2. Check for Tip (e.g., "1. The Colleague Frame...")
-                match = tip_pattern.match(line)
-                if match:
-                    tip_number = match.group(1)
-                    tip_content = match.group(2)
-                    
-                    if current_topic not in topics:
-                        topics[current_topic] = []
-                    
-                    # Store current tip
-                    topics[current_topic].append({
-                        "id": tip_number,
-                        "tip": tip_content
-                    })
-                    
-                    # Special check: Sometimes multiple short tips are on one line in PDF (e.g. "90. Next Steps...")
-                    # We check if 'tip_content' ITSELF contains another numbered tip like "90. Next Steps..."
-                    secondary_match = tip_pattern.search(tip_content)
-                    if secondary_match:
-                        # Find where the second tip starts
-                        start_idx = secondary_match.start()
-                        
-                        # 1. Update the FIRST tip to end before the second one starts
-                        first_tip_text = tip_content[:start_idx].strip()
-                        topics[current_topic][-1]["tip"] = first_tip_text
-                        
-                        # 2. Add the SECOND tip as a new entry
-                        second_tip_number = secondary_match.group(1)
-                        second_tip_text = secondary_match.group(2)
-                        
-                        topics[current_topic].append({
-                            "id": second_tip_number,
-                            "tip": second_tip_text
-                        })
-                else:
-                    # 3. Handle multi-line tips
-                    # If line is NOT a header and NOT a new tip, append to previous tip
-                    if current_topic in topics and topics[current_topic]:
-                        last_tip = topics[current_topic][-1]
-                        
-                        # Clean up formatting: if we accidentally append a section header at end
-                        # Ex: "10. End on a High Note... 🏁 Closing & Follow-Up"
-                        # We try to remove known topic headers if they appear at the END of a tip
-                        for indicator in topic_indicators:
-                           if indicator in line:
-                               line = line.replace(indicator, "").strip()
-
-                        # Only append if it looks like sentence continuation
-                        if line:
-                             last_tip['tip'] += " " + line
+                # Clean up formatting: if we accidentally append a section header at end
+                # Ex: "10. End on a High Note... 🏁 Closing & Follow-Up"
+                # We try to remove known topic headers if they appear at the END of a tip
+                line = _TOPIC_RE.sub("", line).strip()
 
-            # --- Select One Random Tip ---
-            all_topics = list(topics.keys())
-            if not all_topics:
+                # Only append if it looks like sentence continuation
+                if line:
+                     last_tip['tip'] += " " + line
+
+    # Flat list so every tip is equally likely, whatever the size of its topic
+    return [(topic, entry["id"], entry["tip"]) for topic, entries in topics.items() for entry in entries]
+
+
+def _load_tips() -> list[tuple[str, str, str]]:
+    return _parse_tips(TIPS_PDF_PATH, os.stat(TIPS_PDF_PATH).st_mtime)
+
+
+class TipsForInterviewService:
+
+    @staticmethod
+    async def get_random_tips(token: HTTPAuthorizationCredentials):
+        try:
+            # The first call (or one after the PDF changes) parses the file; keep that off the event loop
+            tips = await asyncio.to_thread(_load_tips)
+            if not tips:
                  return {"topic": "General", "tip_number": "0", "tip_text": "No tips found in PDF."}
-            
-            # Pick a random topic
-            random_topic_name = random.choice(all_topics)
-            tips_in_topic = topics[random_topic_name]
-            
-            if not tips_in_topic:
-                 return {"topic": random_topic_name, "tip_number": "0", "tip_text": "No specific tips found in this section."}
 
-            # Pick a random tip from that topic
-            random_tip = random.choice(tips_in_topic)
+            # --- Select One Random Tip ---
+            topic, tip_number, tip_text = random.choice(tips)
 
             return {
-                "topic": random_topic_name,
-                "tip_number": random_tip['id'],
-                "tip_text": random_tip['tip']
+                "topic": topic,
+                "tip_number": tip_number,
+                "tip_text": tip_text
             }
 
         except Exception as e:
@@ -1,4 +1,5 @@
 from fastapi import HTTPException , Depends, status
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
 from src.models.models import User
 from src.db.database import get_db
@@ -12,17 +13,17 @@ class UserDeletionService:
     @staticmethod
     async def DeleteAccount(db: Session, token, User_id: int):
         user_id = get_current_user(token)
-        user = db.query(User).filter(User.id == user_id).first()
-        if user.role != "admin" and user.id != User_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You don't have permission to delete this account, Only admins can delet the account")
+        # Only the columns the permission check needs
+        user = db.query(User.id, User.role).filter(User.id == user_id).first()
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        if user.role != "admin" and user.id != User_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You don't have permission to delete this account, Only admins can delet the account")
         
-        user_to_delete = db.query(User).filter(User.id == User_id).first()
-        if not user_to_delete:
+        # Single DELETE; RETURNING tells us whether the target existed
+        deleted = db.execute(delete(User).where(User.id == User_id).returning(User.id)).first()
+        if not deleted:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User to delete not found")
-        
-        db.delete(user_to_delete)
         db.commit()
         
         return ResponseHandler.create_success("User account deleted successfully", user_id, None)
\ No newline at end of file
@@ -1,6 +1,21 @@
 import io
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+# Pages OCR'd at once for scanned PDFs
+OCR_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+# Rendered pages waiting for OCR are capped at this many, so a long scanned PDF never sits in memory all at once
+OCR_MAX_PENDING = 2 * OCR_WORKERS
+# LSTM engine only (skips the legacy pass), page treated as one uniform block of text
+TESSERACT_CONFIG = "--oem 1 --psm 6"
+TESSERACT_LANG = "eng"
+# Render resolution for scanned pages; enough for tesseract on typical CV fonts
+OCR_DPI = 200
+# Uploaded images (phone photos) larger than this long edge are shrunk before OCR; rendered PDF pages are not
+OCR_MAX_EDGE = 2500
+
 def extract_text_from_file(file_bytes: bytes, filename: str) -> str:
     """
     Extract text content from various file types.
@@ -37,27 +52,45 @@ def extract_text_from_file(file_bytes: bytes, filename: str) -> str:
 
 
 def _extract_from_pdf(file_bytes: bytes) -> str:
-    """Extract text from PDF using PyPDF2 or pdfplumber."""
-    text = ""
-    
+    """Extract text from PDF using PyMuPDF (OCR for pages without a text layer), falling back to pdfplumber."""
 
+    # PyMuPDF first: several times faster than the pure-Python parsers
     try:
-        import PyPDF2
-        pdf_file = io.BytesIO(file_bytes)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        import fitz  # PyMuPDF
+        doc = fitz.open(stream=file_bytes, filetype="pdf") # reads the bytes in place, no BytesIO wrapper
+        
+        # Pages that have a text layer keep it; only the rest are rasterised (here: fitz documents are not thread-safe)
+        # and handed to the OCR pool as they are rendered. Each call runs a tesseract subprocess, so threads scale across cores.
+        page_texts = []
+        pending = deque()  # (page index, OCR future), oldest first
+        ocr_available = None  # probed on the first page without a text layer
+        with ThreadPoolExecutor(max_workers=OCR_WORKERS) as pool:
+            for page_num, page in enumerate(doc):
+                page_text = page.get_text("text")
+                page_texts.append(page_text)
+                if page_text.strip():
+                    continue
+                if ocr_available is None:
+                    ocr_available = _ocr_available()
+                if not ocr_available:
+                    continue
+                if len(pending) >= OCR_MAX_PENDING:
+                    _collect_ocr(page_texts, *pending.popleft())
+                pending.append((page_num, pool.submit(_ocr_image, _render_page(page))))
+            while pending:
+                _collect_ocr(page_texts, *pending.popleft())
+        
+        doc.close()
         
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
+        text = "\n".join(page_text for page_text in page_texts if page_text.strip())
         
         if text.strip():
-            print(f"✅ PDF extracted with PyPDF2: {len(text)} chars")
+            print(f"✅ PDF extracted with PyMuPDF: {len(text)} chars")
             return text.strip()
     except ImportError:
-        print("⚠️ PyPDF2 not installed")
+        print("⚠️ PyMuPDF not installed")
     except Exception as e:
-        print(f"⚠️ PyPDF2 failed: {e}")
+        print(f"⚠️ PyMuPDF failed: {e}")
     
     # Fallback to pdfplumber
     try:
@@ -65,10 +98,7 @@ def _extract_from_pdf(file_bytes: bytes) -> str:
         pdf_file = io.BytesIO(file_bytes)
         
         with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+            text = "\n".join(page_text for page in pdf.pages if (page_text := page.extract_text()))
         
         if text.strip():
             print(f"✅ PDF extracted with pdfplumber: {len(text)} chars")
@@ -78,65 +108,40 @@ def _extract_from_pdf(file_bytes: bytes) -> str:
     except Exception as e:
         print(f"⚠️ pdfplumber failed: {e}")
     
+    raise ValueError("Failed to extract text from PDF. Install: pip install PyMuPDF pdfplumber pytesseract pillow")
 
+
+def _ocr_available() -> bool:
     try:
-        import fitz  # PyMuPDF
-        pdf_file = io.BytesIO(file_bytes)
-        doc = fitz.open(stream=pdf_file, filetype="pdf")
-        
-        for page in doc:
-            page_text = page.get_text()
-            if page_text:
-                text += page_text + "\n"
-        
-        doc.close()
-        
-        if text.strip():
-            print(f"✅ PDF extracted with PyMuPDF: {len(text)} chars")
-            return text.strip()
-    except ImportError:
-        print("⚠️ PyMuPDF not installed")
-    except Exception as e:
-        print(f"⚠️ PyMuPDF failed: {e}")
+        import PIL  # noqa: F401 - availability probes only; the OCR helpers import what they use
+        import pytesseract  # noqa: F401
+    except ImportError as e:
+        print(f"⚠️ OCR dependencies missing, skipping scanned pages: {e}")
+        return False
+    print("⚠️ PDF has pages without a text layer, running OCR on them...")
+    return True
+
+
+def _render_page(page):
+    """Rasterise a PDF page at OCR_DPI; the pixmap is released as soon as it has been copied into a PIL image."""
+    from PIL import Image
     
-    # If all fail, try OCR on the PDF
-    print("⚠️ All PDF text extractors failed, trying OCR...")
-    return _extract_pdf_with_ocr(file_bytes)
+    pix = page.get_pixmap(dpi=OCR_DPI)
+    return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
 
 
-def _extract_pdf_with_ocr(file_bytes: bytes) -> str:
-    """Extract text from PDF using OCR (for scanned PDFs)."""
+def _collect_ocr(page_texts: list[str], page_num: int, future):
     try:
-        import fitz  # PyMuPDF
-        from PIL import Image
-        import pytesseract
-        
-        text = ""
-        pdf_file = io.BytesIO(file_bytes)
-        doc = fitz.open(stream=pdf_file, filetype="pdf")
-        
-        for page_num, page in enumerate(doc):
-            # Convert page to image
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better OCR
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            
-            # OCR the image
-            page_text = pytesseract.image_to_string(img)
-            if page_text:
-                text += page_text + "\n"
-        
-        doc.close()
-        
-        if text.strip():
-            print(f"✅ PDF extracted with OCR: {len(text)} chars")
-            return text.strip()
-        
-    except ImportError as e:
-        print(f"⚠️ OCR dependencies missing: {e}")
+        page_texts[page_num] = future.result()
     except Exception as e:
-        print(f"⚠️ PDF OCR failed: {e}")
+        print(f"⚠️ OCR failed on PDF page {page_num + 1}: {e}")
+
+
+def _ocr_image(img) -> str:
+    """OCR one image with TESSERACT_CONFIG."""
+    import pytesseract
     
-    raise ValueError("Failed to extract text from PDF. Install: pip install PyPDF2 pdfplumber PyMuPDF pytesseract pillow")
+    return pytesseract.image_to_string(img, lang=TESSERACT_LANG, config=TESSERACT_CONFIG)
 
 
 def _extract_from_docx(file_bytes: bytes) -> str:
@@ -195,7 +200,6 @@ def _extract_from_image(file_bytes: bytes) -> str:
     """Extract text from images using OCR."""
     try:
         from PIL import Image
-        import pytesseract
         
         # Open image
         img = Image.open(io.BytesIO(file_bytes))
@@ -204,8 +208,13 @@ def _extract_from_image(file_bytes: bytes) -> str:
         if img.mode != 'RGB':
             img = img.convert('RGB')
         
+        # Shrink oversized photos; below OCR_MAX_EDGE the resolution is left alone
+        scale = OCR_MAX_EDGE / max(img.size)
+        if scale < 1:
+            img = img.resize((round(img.width * scale), round(img.height * scale)))
+        
         # Perform OCR
-        text = pytesseract.image_to_string(img)
+        text = _ocr_image(img)
         
         if text.strip():
             print(f"✅ Image OCR extracted: {len(text)} chars")
@@ -0,0 +1,72 @@
+import logging
+import threading
+import numpy as np
+import cv2
+
+FACE_INPUT_SIZE = (100, 100)
+
+logger = logging.getLogger(__name__)
+
+# Frames are preprocessed on several threads; each gets its own classifier instead of sharing one
+_local = threading.local()
+
+
+def get_face_cascade():
+    """Load the Haar cascade once per thread (None if it is unavailable)."""
+    face_cascade = getattr(_local, "face_cascade", None)
+    if face_cascade is None:
+        try:
+            face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        except Exception:
+            logger.warning("⚠️ Could not load Haar Cascade. Face detection will be skipped.")
+            face_cascade = False
+        _local.face_cascade = face_cascade
+    return face_cascade or None
+
+
+def preprocess_frame(image_input) -> np.ndarray:
+    """
+    Input: JPEG/PNG bytes or a BGR image array
+    Output: the largest face (or the full frame) resized to 100x100 and normalized to [0, 1]
+    """
+    if isinstance(image_input, bytes):
+        image_cv = cv2.imdecode(np.frombuffer(image_input, np.uint8), cv2.IMREAD_COLOR)
+    elif isinstance(image_input, np.ndarray):
+        image_cv = image_input
+    else:
+        raise ValueError("Unsupported image format")
+
+    if image_cv is None:
+        raise ValueError("Could not decode image")
+
+    # Face detection runs on grayscale
+    gray = cv2.cvtColor(image_cv, cv2.COLOR_BGR2GRAY)
+
+    faces = []
+    face_cascade = get_face_cascade()
+    if face_cascade:
+        faces = face_cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(30, 30)
+        )
+
+    if len(faces) > 0:
+        # Use the largest face found
+        (x, y, w, h) = max(faces, key=lambda f: f[2] * f[3])
+        logger.debug("✅ Face Detected at: x=%d, y=%d, w=%d, h=%d", x, y, w, h)
+        face_rgb = cv2.cvtColor(image_cv[y:y+h, x:x+w], cv2.COLOR_BGR2RGB)
+    else:
+        logger.debug("⚠️ No face detected. Using full image.")
+        face_rgb = cv2.cvtColor(image_cv, cv2.COLOR_BGR2RGB)
+
+    return cv2.resize(face_rgb, FACE_INPUT_SIZE).astype('float32') / 255.0
+
+
+def average_hash(face: np.ndarray) -> int:
+    """64-bit perceptual hash (8x8 average hash) of a preprocessed face, for spotting near-duplicate frames."""
+    gray = cv2.cvtColor(face, cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(gray, (8, 8), interpolation=cv2.INTER_AREA)
+    bits = (small > small.mean()).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
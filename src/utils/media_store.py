@@ -0,0 +1,48 @@
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Local blob store for raw video frames; the DB keeps only the relative key
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", "media"))
+
+# Prefix marking a zstd-compressed audio blob in LiveChunksInput.audio_chunk (unprefixed blobs are raw)
+ZSTD_AUDIO_MAGIC = b"ZAU1"
+# Containers whose audio is already compressed (WebM/Matroska header and MediaRecorder continuation Clusters,
+# Ogg, MP3, FLAC); zstd would not shrink them. MP4/AAC is detected by its "ftyp" box at offset 4.
+_COMPRESSED_AUDIO_HEADERS = (b"\x1a\x45\xdf\xa3", b"\x1f\x43\xb6\x75", b"OggS", b"ID3", b"\xff\xfb", b"fLaC")
+# ZstdCompressor instances are not thread-safe and chunk writers pack from several threads, so keep one per thread
+_zstd_local = threading.local()
+
+
+def save_video_frame(session_id: int, frame: bytes) -> str:
+    """Write one frame to MEDIA_ROOT/<session_id>/<ns>.jpg and return its key."""
+    key = f"{session_id}/{time.time_ns()}.jpg"
+    path = MEDIA_ROOT / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(frame)
+    return key
+
+
+def delete_session_media(session_id: int):
+    shutil.rmtree(MEDIA_ROOT / str(session_id), ignore_errors=True)
+
+
+def _zstd_compressor():
+    compressor = getattr(_zstd_local, "compressor", None)
+    if compressor is None:
+        compressor = _zstd_local.compressor = zstandard.ZstdCompressor(level=3)
+    return compressor
+
+
+def pack_audio_chunk(audio) -> bytes:
+    """zstd-compress an uncompressed (WAV/PCM) audio blob for storage; anything else is stored as is."""
+    audio = bytes(audio)
+    if zstandard is None or audio.startswith(_COMPRESSED_AUDIO_HEADERS) or audio[4:8] == b"ftyp":
+        return audio
+    return ZSTD_AUDIO_MAGIC + _zstd_compressor().compress(audio)